@@ -1,10 +1,18 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 import os
+import json
 from dotenv import load_dotenv
 import logging
 from user_profile_setting import init_db, get_user_profile
-from language_learning_manager import LanguageLearningManager
+from language_learning_manager import LanguageLearningManager, get_shared_dictionary
+from session_pool import SessionPool
+from persistence import get_write_behind
+from request_capture import RequestCapture
+import metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,7 +20,44 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()  # Load environment variables from .env file
 
-app = FastAPI()
+# Per-user sessions keep quiz state between requests; they all share one dictionary
+sessions = SessionPool(
+    LanguageLearningManager,
+    max_sessions=int(os.getenv("SESSION_POOL_SIZE", "1000")),
+    idle_timeout=float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
+)
+
+# Opt-in: append every chat message to this JSONL file for benchmarks/replay_requests.py
+capture_file = os.getenv("REQUEST_CAPTURE_FILE")
+capture = RequestCapture(capture_file, write_behind=get_write_behind()) if capture_file else None
+
+@asynccontextmanager
+async def lifespan(app):
+    get_shared_dictionary()  # Load the dictionary once, before the first request
+    yield
+    sessions.clear()
+    get_write_behind().close()  # Flush pending writes before the worker exits
+    if capture is not None:
+        capture.close()
+
+app = FastAPI(lifespan=lifespan)
+
+if metrics.METRICS_ENABLED:
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template rather than raw path to keep the number of series bounded
+            route = request.scope.get("route")
+            endpoint = route.path if route is not None else "unmatched"
+            metrics.http_request_seconds.observe(
+                time.perf_counter() - start, request.method, endpoint, str(status)
+            )
 
 # Initialize the database
 init_db()
@@ -21,25 +66,102 @@ class Message(BaseModel):
     user_id: int
     message: str
 
+class QuizWordsRequest(BaseModel):
+    user_id: int
+    count: int = Field(default=10, ge=1, le=100)
+    # Start a new quiz first; a quiz is also started when none is in progress
+    start: bool = False
+
+class WordMark(BaseModel):
+    word: str
+    is_known: bool
+
+class WordMarksRequest(BaseModel):
+    user_id: int
+    marks: list[WordMark] = Field(max_length=1000)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Chatbot API. Use the /chatbot endpoint to interact with the chatbot."}
 
 @app.post("/chatbot")
 async def chatbot_endpoint(message: Message):
+    if capture is not None:
+        capture.record(message.user_id, message.message, "/chatbot")
     try:
-        chatbot = LanguageLearningManager(message.user_id)
-        response = chatbot.process_message(message.message)
+        with sessions.use(message.user_id) as chatbot:
+            async with chatbot.message_lock:
+                response = await chatbot.aprocess_message(message.message)
         logger.info(f"Chatbot response: {response}")
         return {"response": response}
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
+@app.post("/chatbot/stream")
+async def chatbot_stream_endpoint(message: Message):
+    # Server-sent events: one "data" event per piece of the reply, then a "done" event
+    if capture is not None:
+        capture.record(message.user_id, message.message, "/chatbot/stream")
+
+    async def events():
+        # The session is held while the reply streams
+        with sessions.use(message.user_id) as chatbot:
+            async with chatbot.message_lock:
+                try:
+                    async for part in chatbot.aprocess_message_stream(message.message):
+                        yield f"data: {json.dumps({'delta': part})}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                except Exception as e:
+                    logger.error(f"Unexpected error: {str(e)}")
+                    yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/quiz/next")
+async def quiz_next_endpoint(request: QuizWordsRequest):
+    # The next quiz words with their info in one response; mark them with /quiz/marks
+    with sessions.use(request.user_id) as chatbot:
+        async with chatbot.message_lock:
+            try:
+                if request.start or chatbot.peek_next_quiz_word() is None:
+                    chatbot.start_quiz()
+                word_infos = await chatbot.aget_next_quiz_words(request.count)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                logger.error(f"Unexpected error: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+            return {
+                "words": [{"word": word, "info": info} for word, info in word_infos],
+                "remaining": len(chatbot.current_quiz_words) - chatbot.current_quiz_index,
+            }
+
+@app.post("/quiz/marks")
+async def quiz_marks_endpoint(request: WordMarksRequest):
+    marks = {mark.word: mark.is_known for mark in request.marks}
+    with sessions.use(request.user_id) as chatbot:
+        async with chatbot.message_lock:
+            unknown = [word for word in marks if word not in chatbot.dictionary]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Not in the dictionary: {', '.join(unknown[:20])}")
+            try:
+                achieved_milestones = chatbot.mark_words(marks.items())
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    return {"marked": len(marks), "milestones": achieved_milestones}
+
 @app.post("/set_daily_target")
 async def set_daily_target(user_id: int, target: int):
-    chatbot = LanguageLearningManager(user_id)
-    return {"message": chatbot.set_daily_target(target)}
+    with sessions.use(user_id) as chatbot:
+        async with chatbot.message_lock:
+            return {"message": chatbot.set_daily_target(target)}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; set METRICS_ENABLED=1 to enable them.")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/get_profile")
 async def get_profile(user_id: int):
@@ -48,4 +170,4 @@ async def get_profile(user_id: int):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,57 @@
+"""Throughput of the /chatbot message path with N simultaneous simulated users.
+
+Compares the old blocking call (sync OpenAI client inside the event loop) with
+``aprocess_message``. Run from the repository root:
+
+    python -m benchmarks.benchmark_async_chatbot --users 50 --latency 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import FakeAsyncOpenAI, FakeOpenAI, make_workspace, synthetic_words
+
+
+async def run_users(managers, words, messages_per_user, use_async):
+    # Every search is a distinct dictionary word, so each one passes validation and misses the cache
+    offset = len(managers) * messages_per_user if use_async else 0
+
+    async def user(index, manager):
+        for i in range(messages_per_user):
+            message = f"{words[offset + index * messages_per_user + i]}?"
+            if use_async:
+                await manager.aprocess_message(message)
+            else:
+                manager.process_message(message)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(index, manager) for index, manager in enumerate(managers)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    make_workspace(2 * args.users * args.messages)
+    words = synthetic_words(2 * args.users * args.messages)
+    from language_learning_manager import LanguageLearningManager
+
+    sync_client = FakeOpenAI(args.latency)
+    async_client = FakeAsyncOpenAI(args.latency)
+    managers = [
+        LanguageLearningManager(user_id, openai_client=sync_client, async_openai_client=async_client)
+        for user_id in range(args.users)
+    ]
+    total = args.users * args.messages
+    for label, use_async, client in (('blocking', False, sync_client), ('async', True, async_client)):
+        elapsed = asyncio.run(run_users(managers, words, args.messages, use_async))
+        print(f"{label:>8}: {total} messages from {args.users} users in {elapsed:.2f}s "
+              f"({total / elapsed:.1f} msg/s, {client.calls} OpenAI calls)")
+
+
+if __name__ == '__main__':
+    main()
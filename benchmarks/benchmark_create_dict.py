@@ -0,0 +1,90 @@
+"""Time the dictionary build of ``create_dict`` against the old row-by-row loop.
+
+Generates a word list and a frequency list (with case variants of the words, as
+in subtitle corpora) and builds ``dutch_dictionary.csv`` both ways. Run from the
+repository root:
+
+    python -m benchmarks.benchmark_create_dict --words 400000 --frequencies 1000000
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import create_dict
+
+
+def legacy_build(words_file, frequency_file, output_file):
+    # The previous implementation, minus its per-row debug prints
+    with open(words_file, encoding='utf-8') as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader)
+        words = [row[0] for row in reader if row]
+    word_frequencies = {}
+    with open(frequency_file, encoding='utf-8') as csv_file:
+        reader = csv.reader(csv_file)
+        next(reader)
+        for row in reader:
+            if len(row) >= 2:
+                try:
+                    word_frequencies[row[0]] = int(row[1])
+                except ValueError:
+                    word_frequencies[row[0]] = 0
+    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    data = [[word, word_frequencies.get(word, 0), 0, current_time] for word in words]
+    data.sort(key=lambda x: x[1], reverse=True)
+    with open(output_file, mode='w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['Word', 'Frequency', 'Status', 'Last Updated'])
+        writer.writerows(data)
+
+
+def build(words_file, frequency_file, output_file):
+    with contextlib.redirect_stdout(io.StringIO()):
+        words = create_dict.read_words_from_csv(words_file)
+        word_frequencies = create_dict.read_word_frequencies_from_csv(frequency_file)
+        create_dict.create_dutch_dictionary_csv(words, word_frequencies, output_file)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=400000)
+    parser.add_argument('--frequencies', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        words_file = os.path.join(directory, 'dutch_words.csv')
+        frequency_file = os.path.join(directory, 'dutch_word_frequency.csv')
+        with open(words_file, mode='w', encoding='utf-8') as csv_file:
+            csv_file.write('Word\n')
+            for i in range(args.words):
+                csv_file.write(f"woord{i}\n")
+        with open(frequency_file, mode='w', encoding='utf-8') as csv_file:
+            csv_file.write('Word,Frequency\n')
+            for i in range(args.frequencies):
+                word = f"woord{i // 2}" if i % 2 == 0 else f"Woord{i // 2}"
+                csv_file.write(f"{word},{args.frequencies - i}\n")
+
+        output_file = os.path.join(directory, 'dutch_dictionary.csv')
+        result = {
+            'words': args.words,
+            'frequencies': args.frequencies,
+            'legacy_seconds': timed(legacy_build, words_file, frequency_file, output_file),
+            'build_seconds': timed(build, words_file, frequency_file, output_file),
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
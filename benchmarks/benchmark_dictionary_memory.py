@@ -0,0 +1,92 @@
+"""Resident memory and load time of the in-memory dictionary.
+
+Each representation is loaded in a fresh interpreter so RSS numbers do not mix.
+``legacy`` is the previous list of dicts with ``datetime`` values parsed by
+``strptime``; ``compact`` is ``WordDictionary`` loaded from the SQLite store.
+Linux only (reads /proc/self/status). Run from the repository root:
+
+    python -m benchmarks.benchmark_dictionary_memory --words 400000
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import make_workspace
+
+
+def rss_bytes():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def load_legacy(csv_file_path):
+    dictionary = []
+    with open(csv_file_path, mode='r', encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        next(csv_reader)
+        for word, frequency, status, last_updated in csv_reader:
+            dictionary.append({
+                'word': word,
+                'frequency': int(frequency),
+                'status': int(status),
+                'last_updated': datetime.strptime(last_updated, '%Y-%m-%d %H:%M:%S')
+            })
+    return dictionary
+
+
+def measure(mode):
+    from dictionary_store import DictionaryStore
+    from language_learning_manager import load_dictionary
+
+    store = DictionaryStore()
+    if store.is_empty():
+        store.import_csv('dutch_dictionary.csv')
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        dictionary = load_legacy('dutch_dictionary.csv')
+    else:
+        dictionary = load_dictionary(store, 'dutch_dictionary.csv')
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(json.dumps({'mode': mode, 'words': len(dictionary), 'load_seconds': elapsed,
+                      'rss_bytes': rss_bytes() - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=400000)
+    parser.add_argument('--mode', choices=['legacy', 'compact'])
+    parser.add_argument('--workspace')
+    args = parser.parse_args()
+
+    if args.mode:
+        os.chdir(args.workspace)
+        measure(args.mode)
+        return
+
+    root = os.getcwd()
+    workspace = make_workspace(args.words)
+    for mode in ('legacy', 'compact'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.benchmark_dictionary_memory', '--mode', mode, '--workspace', workspace],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>8}: {result['words']} words, load {result['load_seconds']:.2f}s, "
+              f"RSS +{result['rss_bytes'] / 2**20:.1f} MiB "
+              f"({result['rss_bytes'] / max(1, result['words']):.0f} bytes/word)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Peak memory of the frequency-list ingestion for growing inputs.
+
+Each input size is processed by ``download_frequency.process_csv`` in a fresh
+interpreter; peak RSS should stay flat as the number of lines grows. Also
+times ``download_words.save_to_csv`` on a generated word stream. Run from the
+repository root:
+
+    python -m benchmarks.benchmark_ingestion --lines 1000000 4000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def write_frequency_list(path, lines):
+    with open(path, mode='w', encoding='utf-8') as frequency_file:
+        for i in range(lines):
+            frequency_file.write(f"woord{i} {lines - i}\n")
+
+
+def measure(path):
+    import download_frequency
+    import download_words
+
+    start = time.perf_counter()
+    # Read and write the same path, as the download script does
+    download_frequency.process_csv(path, path, progress_interval=float('inf'))
+    frequency_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    download_words.save_to_csv((f"woord{i}" for i in range(1000000)), path + '.words.csv',
+                               progress_interval=float('inf'))
+    words_seconds = time.perf_counter() - start
+    return {
+        'frequency_seconds': frequency_seconds,
+        'words_seconds': words_seconds,
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000000, 4000000])
+    parser.add_argument('--measure')
+    args = parser.parse_args()
+
+    if args.measure:
+        # Keep the scripts' own output out of the JSON result line
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                result = measure(args.measure)
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    workspace = tempfile.mkdtemp(prefix='chat2dutch-bench-')
+    for lines in args.lines:
+        path = os.path.join(workspace, f'frequency_{lines}.txt')
+        write_frequency_list(path, lines)
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.benchmark_ingestion', '--measure', path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{lines:>9} lines: process_csv {result['frequency_seconds']:.2f}s, "
+              f"save_to_csv (1M words) {result['words_seconds']:.2f}s, "
+              f"peak RSS {result['max_rss_bytes'] / 2**20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
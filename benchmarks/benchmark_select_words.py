@@ -0,0 +1,85 @@
+"""Quiz word selection and status updates on a large dictionary.
+
+Compares the previous linear-scan ``select_words`` with the indexed version, and
+the quiz start of a new user with one who has reviewed ``--reviewed`` words.
+Run from the repository root:
+
+    python -m benchmarks.benchmark_select_words --words 400000 --history 200
+"""
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks.common import FakeAsyncOpenAI, FakeOpenAI, make_workspace
+
+
+def legacy_select_words(dictionary, search_history, daily_target):
+    # dictionary: list of {'word', 'status'} dicts, as the manager used to hold
+    prioritized_words = []
+    for word in search_history:
+        dict_entry = next((entry for entry in dictionary if entry['word'] == word), None)
+        if dict_entry:
+            prioritized_words.append(word)
+    for entry in dictionary:
+        if entry['status'] == 0 and entry['word'] not in prioritized_words:
+            prioritized_words.append(entry['word'])
+            if len(prioritized_words) >= daily_target:
+                break
+    return prioritized_words
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=400000)
+    parser.add_argument('--history', type=int, default=200)
+    parser.add_argument('--target', type=int, default=20)
+    parser.add_argument('--reviewed', type=int, default=50000)
+    args = parser.parse_args()
+
+    make_workspace(args.words, daily_target=args.target)
+    from language_learning_manager import LanguageLearningManager
+
+    manager = LanguageLearningManager(openai_client=FakeOpenAI(), async_openai_client=FakeAsyncOpenAI())
+    entries = [dict(entry, status=0) for entry in manager.dictionary]
+    # Mark the most frequent words known, as for a user who has been learning for a while
+    for entry in entries[:1000]:
+        manager.update_word_status(entry['word'], True)
+        entry['status'] = 1
+    # History words spread over the rest of the dictionary, like words searched over a long time
+    step = max(1, (len(entries) - 1000) // max(1, args.history))
+    for entry in reversed(entries[1000::step][:args.history]):
+        manager.update_search_history(entry['word'], False)
+    history = list(manager.search_history)
+
+    legacy = timed(lambda: legacy_select_words(entries, history, manager.daily_target), 1)
+    indexed = timed(manager.select_words, 100)
+    now = datetime.now()
+    status = timed(lambda: manager.word_status.set_status(entries[5000]['word'], 1, now) and
+                   manager.word_status.set_status(entries[5000]['word'], 0, now), 1000)
+    print(f"dictionary: {len(entries)} words, history: {len(history)} words")
+    print(f"legacy select_words:  {legacy * 1000:10.3f} ms")
+    print(f"indexed select_words: {indexed * 1000:10.3f} ms")
+    print(f"status toggle (index maintenance): {status * 1e6:.1f} us")
+
+    new_user = LanguageLearningManager(user_id=1, openai_client=FakeOpenAI(), async_openai_client=FakeAsyncOpenAI())
+    reviewer = LanguageLearningManager(user_id=2, openai_client=FakeOpenAI(), async_openai_client=FakeAsyncOpenAI())
+    reviewed = entries[:args.reviewed]
+    start = time.perf_counter()
+    for i, entry in enumerate(reviewed):
+        # Every tenth word forgotten, so some words are due right away
+        reviewer.mark_word(entry['word'], i % 10 != 0)
+    review = (time.perf_counter() - start) / max(1, len(reviewed))
+    print(f"mark_word with spaced repetition: {review * 1e6:.1f} us")
+    print(f"select_words, new user:            {timed(new_user.select_words, 100) * 1000:10.3f} ms")
+    print(f"select_words, {len(reviewed)} words reviewed: {timed(reviewer.select_words, 100) * 1000:10.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Cold start time of the app_main and chat_interface entry points.
+
+Every measurement runs in a fresh interpreter inside a workspace with a synthetic
+dictionary, using the fake OpenAI clients. For each dictionary size it measures
+``app_main`` three times: on first start (the CSV is imported into an empty
+dictionary database), on a restart without a dictionary snapshot and on a restart
+with one. Each time it reports the import, the time until ``GET /`` answers and
+the first quiz word. ``chat_interface`` is measured the same way, up to its first
+quiz word; it needs gradio. Run from the repository root:
+
+    python -m benchmarks.benchmark_startup --sizes 100000,1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from benchmarks.common import make_workspace
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ('first_start', 'no_snapshot', 'snapshot')
+
+
+def measure_app_main():
+    results = {}
+    start = time.perf_counter()
+    import app_main
+    results['import_seconds'] = time.perf_counter() - start
+
+    import language_learning_manager
+    from benchmarks.common import FakeAsyncOpenAI, FakeOpenAI
+    language_learning_manager._openai_client = FakeOpenAI()
+    language_learning_manager._async_openai_client = FakeAsyncOpenAI()
+    from fastapi.testclient import TestClient
+    with TestClient(app_main.app) as client:
+        client.get('/').raise_for_status()
+        results['ready_seconds'] = time.perf_counter() - start
+        client.post('/chatbot', json={'user_id': 1, 'message': 'daily quiz'}).raise_for_status()
+        results['first_quiz_word_seconds'] = time.perf_counter() - start
+    return results
+
+
+def measure_chat_interface():
+    results = {}
+    start = time.perf_counter()
+    try:
+        import chat_interface
+    except ImportError as e:
+        return {'error': str(e)}
+    results['import_seconds'] = time.perf_counter() - start
+
+    import language_learning_manager
+    from benchmarks.common import FakeAsyncOpenAI, FakeOpenAI
+    language_learning_manager._openai_client = FakeOpenAI()
+    language_learning_manager._async_openai_client = FakeAsyncOpenAI()
+    for _ in chat_interface.chat('daily quiz', []):
+        pass
+    results['first_quiz_word_seconds'] = time.perf_counter() - start
+    return results
+
+
+def run(entry_point, workspace):
+    env = dict(os.environ, PYTHONPATH=REPOSITORY_ROOT, OPENAI_API_KEY='sk-benchmark',
+               DICTIONARY_SNAPSHOT_FILE='dictionary_snapshot.bin')
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.benchmark_startup', '--measure', entry_point],
+        capture_output=True, text=True, cwd=workspace, env=env,
+    )
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1]}
+    # The measured code prints; keep the JSON result on the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def reset(workspace, scenario):
+    if scenario == 'first_start':
+        for name in os.listdir(workspace):
+            if name.startswith('dictionary_store.db') or name.startswith('word_info_cache.db'):
+                os.remove(os.path.join(workspace, name))
+    if scenario in ('first_start', 'no_snapshot'):
+        snapshot = os.path.join(workspace, 'dictionary_snapshot.bin')
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='100000,1000000', help='Comma-separated dictionary sizes')
+    parser.add_argument('--entry-points', default='app_main,chat_interface')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--measure', choices=['app_main', 'chat_interface'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure = measure_app_main if args.measure == 'app_main' else measure_chat_interface
+        print(json.dumps(measure()))
+        return
+
+    results = {}
+    for size in [int(size) for size in args.sizes.split(',')]:
+        cwd = os.getcwd()
+        workspace = make_workspace(size)
+        os.chdir(cwd)
+        try:
+            for entry_point in args.entry_points.split(','):
+                for scenario in SCENARIOS:
+                    reset(workspace, scenario)
+                    result = run(entry_point, workspace)
+                    results.setdefault(str(size), {}).setdefault(entry_point, {})[scenario] = result
+                    if 'error' in result:
+                        print(f"{size:>8} {entry_point:<15} {scenario:<12} failed: {result['error']}")
+                        break
+                    print(f"{size:>8} {entry_point:<15} {scenario:<12} " + '  '.join(
+                        f"{name.replace('_seconds', '')}={value * 1000:.0f}ms" for name, value in result.items()
+                    ))
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Offline benchmarks of the manager hot paths and the /chatbot endpoint.
+
+Each dictionary size runs in a fresh interpreter with a synthetic dictionary and
+the fake OpenAI clients, and the results are written as JSON. Pass an earlier
+result file with ``--compare`` to print the change per metric and exit non-zero
+on regressions. Run from the repository root:
+
+    python -m benchmarks.benchmark_suite --sizes 10000 100000 1000000 --output results.json
+    python -m benchmarks.benchmark_suite --compare results.json --output new.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.common import FakeAsyncOpenAI, FakeOpenAI, make_workspace
+
+# Metrics where a higher value is better; everything else is a duration
+HIGHER_IS_BETTER = {'chatbot_requests_per_second'}
+
+
+def timed(function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(size, latency, requests):
+    make_workspace(size, daily_target=20)
+    import language_learning_manager
+    language_learning_manager._openai_client = FakeOpenAI(latency)
+    language_learning_manager._async_openai_client = FakeAsyncOpenAI(latency)
+    from language_learning_manager import LanguageLearningManager
+
+    results = {}
+    start = time.perf_counter()
+    manager = LanguageLearningManager(user_id=1)
+    results['manager_init_seconds'] = time.perf_counter() - start
+    results['load_dictionary_from_csv_seconds'] = timed(manager.load_dictionary_from_csv)
+
+    words = manager.dictionary.words
+    marked = words[:min(len(words), 2000)]
+    results['mark_word_seconds'] = timed(
+        lambda: [manager.mark_word(word, i % 3 != 0) for i, word in enumerate(marked)]
+    ) / len(marked)
+    searched = words[-min(len(words), 2000):]
+    results['update_search_history_seconds'] = timed(
+        lambda: [manager.update_search_history(word, False) for word in searched]
+    ) / len(searched)
+    results['select_words_seconds'] = timed(manager.select_words, 100)
+    results['save_dictionary_to_csv_seconds'] = timed(manager.save_dictionary_to_csv)
+
+    import app_main
+    from fastapi.testclient import TestClient
+    logging.getLogger('app_main').setLevel(logging.WARNING)
+    messages = ['daily quiz'] + ['known', 'unknown'] * 10 + [f"{words[i % len(words)]}?" for i in range(5)]
+    latencies = []
+    with TestClient(app_main.app) as client:
+        start = time.perf_counter()
+        for i in range(requests):
+            message = messages[i % len(messages)]
+            request_start = time.perf_counter()
+            response = client.post('/chatbot', json={'user_id': 100 + i // len(messages), 'message': message})
+            latencies.append(time.perf_counter() - request_start)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+    results['chatbot_p50_seconds'] = percentile(latencies, 0.5)
+    results['chatbot_p95_seconds'] = percentile(latencies, 0.95)
+    results['chatbot_requests_per_second'] = requests / elapsed
+    return results
+
+
+def run_size(size, latency, requests):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.benchmark_suite', '--measure', str(size),
+         '--latency', str(latency), '--requests', str(requests)],
+        check=True, capture_output=True, text=True, cwd=os.getcwd(),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(previous, current, threshold):
+    regressions = []
+    for size, metrics in current['results'].items():
+        for name, value in metrics.items():
+            before = previous['results'].get(size, {}).get(name)
+            if not before or not value:
+                continue
+            ratio = before / value if name in HIGHER_IS_BETTER else value / before
+            flag = ' REGRESSION' if ratio > threshold else ''
+            print(f"{size:>8} {name:<36} {before:12.6g} -> {value:12.6g}  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((size, name))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--latency', type=float, default=0.05, help='Fake OpenAI latency per call in seconds')
+    parser.add_argument('--requests', type=int, default=100, help='Number of /chatbot requests per size')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='Earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown factor reported as a regression')
+    parser.add_argument('--measure', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        # The benchmarked code prints; keep the JSON result on the last line
+        print(json.dumps(measure(args.measure, args.latency, args.requests)))
+        return
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'latency': args.latency,
+        'requests': args.requests,
+        'results': {},
+    }
+    for size in args.sizes:
+        results['results'][str(size)] = run_size(size, args.latency, args.requests)
+        print(f"{size} words: " + ', '.join(
+            f"{name}={value:.6g}" for name, value in results['results'][str(size)].items()
+        ))
+    with open(args.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results written to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            regressions = compare(json.load(previous_file), results, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
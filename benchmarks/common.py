@@ -0,0 +1,144 @@
+import asyncio
+import csv
+import json
+import os
+import re
+import tempfile
+import time
+from types import SimpleNamespace
+
+
+def reply_for(messages):
+    prompt = messages[-1]['content']
+    if "Respond with only 'Yes' or 'No'" in prompt:
+        return "Yes"
+    batch = re.search(r'each of these Dutch words: (\[.*\])', prompt)
+    if batch:
+        return json.dumps({'words': [
+            {
+                'word': word,
+                'english': 'word',
+                'chinese': '词 (cí)',
+                'examples': [
+                    {'dutch': 'Dit is een woord.', 'english': 'This is a word.'},
+                    {'dutch': 'Welk woord zoek je?', 'english': 'Which word are you looking for?'},
+                ],
+                'usage': 'A generic noun.',
+            }
+            for word in json.loads(batch.group(1))
+        ]})
+    return (
+        "Word: woord\n"
+        "English: word\n"
+        "Chinese: 词 (cí)\n"
+        "Examples:\n"
+        "1. Dit is een woord. (This is a word.)\n"
+        "2. Welk woord zoek je? (Which word are you looking for?)\n"
+        "Usage: A generic noun."
+    )
+
+
+def _completion(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=50, completion_tokens=80, total_tokens=130),
+    )
+
+
+def _chunks(content, pieces=8):
+    size = max(1, len(content) // pieces)
+    for start in range(0, len(content), size):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[start:start + size]))])
+
+
+class FakeOpenAI:
+    """Stand-in for openai.OpenAI that sleeps for ``latency`` seconds per completion.
+
+    With ``stream=True`` the reply arrives in chunks spread over the same latency.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return self._stream(reply_for(messages))
+        if self.latency:
+            time.sleep(self.latency)
+        return _completion(reply_for(messages))
+
+    def _stream(self, content):
+        chunks = list(_chunks(content))
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+class FakeAsyncOpenAI:
+    """Stand-in for openai.AsyncOpenAI that awaits ``latency`` seconds per completion.
+
+    With ``stream=True`` the reply arrives in chunks spread over the same latency.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return self._stream(reply_for(messages))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _completion(reply_for(messages))
+
+    async def _stream(self, content):
+        chunks = list(_chunks(content))
+        for chunk in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+def synthetic_words(count):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = []
+    for i in range(count):
+        word = ''
+        n = i
+        while True:
+            word += letters[n % 26]
+            n //= 26
+            if n == 0:
+                break
+        words.append('w' + word)
+    return words
+
+
+def write_dictionary_csv(path, count, known_every=0):
+    with open(path, mode='w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['Word', 'Frequency', 'Status', 'Last Updated'])
+        for rank, word in enumerate(synthetic_words(count)):
+            status = 1 if known_every and rank % known_every == 0 else 0
+            writer.writerow([word, count - rank, status, '2024-09-01 12:00:00'])
+
+
+def make_workspace(dictionary_size=1000, daily_target=20):
+    """Create a temporary working directory with the files LanguageLearningManager expects and chdir into it."""
+    workspace = tempfile.mkdtemp(prefix='chat2dutch-bench-')
+    write_dictionary_csv(os.path.join(workspace, 'dutch_dictionary.csv'), dictionary_size)
+    with open(os.path.join(workspace, 'profile_settings.json'), 'w') as f:
+        json.dump({
+            'daily_target': daily_target,
+            'milestones_rewards': [{'milestone': 1000, 'reward': 'cake'}],
+            'total_words_learned': 0
+        }, f)
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-benchmark')
+    os.chdir(workspace)
+    return workspace
@@ -0,0 +1,244 @@
+"""Load generator for the app_main API.
+
+Simulated users set their daily target, take quizzes ("daily quiz" followed by
+known/unknown marks, or with ``--batch-quiz`` one ``/quiz/next`` and one
+``/quiz/marks`` request), search words (some of them misspelled) and check their
+profile, with configurable think time. Reports p50/p95/p99 latency and requests
+per second per endpoint.
+
+Against a running app:
+
+    python -m benchmarks.load_generator --url http://127.0.0.1:8000 --users 50 --duration 60
+
+Or fully offline: ``--spawn`` starts the mock OpenAI server and the app on a
+synthetic dictionary in a temporary workspace, runs the load and stops both:
+
+    python -m benchmarks.load_generator --spawn --users 50 --duration 60 --mock-latency lognormal:0.5:0.6
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import make_workspace, synthetic_words
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def misspell(word):
+    if len(word) < 3:
+        return word + 'e'
+    i = random.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+class LoadGenerator:
+    def __init__(self, url, users, duration, words, first_user_id=1000, search_share=0.3, profile_share=0.05,
+                 misspelled_share=0.1, known_share=0.7, daily_target=10, think_time=0.0, timeout=60.0,
+                 batch_quiz=False):
+        self.url = url
+        self.users = users
+        self.duration = duration
+        self.words = words
+        self.first_user_id = first_user_id
+        self.search_share = search_share
+        self.profile_share = profile_share
+        self.misspelled_share = misspelled_share
+        self.known_share = known_share
+        self.daily_target = daily_target
+        self.think_time = think_time
+        self.timeout = timeout
+        self.batch_quiz = batch_quiz
+        self.samples = {}  # endpoint -> [(latency, ok)]
+
+    async def request(self, client, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+            body = response.json() if ok else None
+        except httpx.HTTPError:
+            ok, body = False, None
+        self.samples.setdefault(endpoint, []).append((time.perf_counter() - start, ok))
+        return body
+
+    async def think(self):
+        if self.think_time:
+            await asyncio.sleep(random.expovariate(1 / self.think_time))
+
+    async def chat(self, client, user_id, message):
+        body = await self.request(client, '/chatbot', 'POST', '/chatbot', json={'user_id': user_id, 'message': message})
+        return body['response'] if body else ''
+
+    async def user(self, user_id, deadline):
+        async with httpx.AsyncClient(base_url=self.url, timeout=self.timeout) as client:
+            await self.request(client, '/set_daily_target', 'POST', '/set_daily_target',
+                               params={'user_id': user_id, 'target': self.daily_target})
+            while time.perf_counter() < deadline:
+                draw = random.random()
+                if draw < self.profile_share:
+                    await self.request(client, '/get_profile', 'GET', '/get_profile', params={'user_id': user_id})
+                elif draw < self.profile_share + self.search_share:
+                    word = random.choice(self.words)
+                    if random.random() < self.misspelled_share:
+                        word = misspell(word)
+                    await self.chat(client, user_id, f"{word}?")
+                elif self.batch_quiz:
+                    body = await self.request(client, '/quiz/next', 'POST', '/quiz/next',
+                                              json={'user_id': user_id, 'count': self.daily_target, 'start': True})
+                    words = body['words'] if body else []
+                    for _ in words:
+                        await self.think()
+                    if words:
+                        marks = [{'word': word['word'], 'is_known': random.random() < self.known_share} for word in words]
+                        await self.request(client, '/quiz/marks', 'POST', '/quiz/marks',
+                                           json={'user_id': user_id, 'marks': marks})
+                else:
+                    reply = await self.chat(client, user_id, 'daily quiz')
+                    while "word:" in reply and time.perf_counter() < deadline:
+                        await self.think()
+                        mark = 'known' if random.random() < self.known_share else 'unknown'
+                        reply = await self.chat(client, user_id, mark)
+                await self.think()
+
+    async def run(self):
+        deadline = time.perf_counter() + self.duration
+        start = time.perf_counter()
+        await asyncio.gather(*(self.user(self.first_user_id + i, deadline) for i in range(self.users)))
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        endpoints = {}
+        all_latencies = []
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = [latency for latency, _ in samples]
+            all_latencies.extend(latencies)
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'errors': sum(1 for _, ok in samples if not ok),
+                'requests_per_second': len(samples) / elapsed,
+                'p50_seconds': percentile(latencies, 0.50),
+                'p95_seconds': percentile(latencies, 0.95),
+                'p99_seconds': percentile(latencies, 0.99),
+            }
+        return {
+            'users': self.users,
+            'elapsed_seconds': elapsed,
+            'requests': len(all_latencies),
+            'requests_per_second': len(all_latencies) / elapsed,
+            'p50_seconds': percentile(all_latencies, 0.50),
+            'p95_seconds': percentile(all_latencies, 0.95),
+            'p99_seconds': percentile(all_latencies, 0.99),
+            'endpoints': endpoints,
+        }
+
+
+def wait_until_up(url, process, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process serving {url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def spawn(args):
+    """Start the mock OpenAI server and the app in a temporary workspace; returns both processes."""
+    make_workspace(args.dictionary_size, daily_target=args.daily_target)
+    env = dict(os.environ, PYTHONPATH=REPOSITORY_ROOT, OPENAI_API_KEY='mock',
+               OPENAI_BASE_URL=f"http://127.0.0.1:{args.mock_port}/v1")
+    mock = subprocess.Popen([
+        sys.executable, '-m', 'benchmarks.mock_openai_server', '--port', str(args.mock_port),
+        '--latency', args.mock_latency, '--error-rate', str(args.mock_error_rate),
+        '--rate-limit-rate', str(args.mock_rate_limit_rate), '--max-rps', str(args.mock_max_rps),
+    ], env=env, cwd=REPOSITORY_ROOT)
+    app = subprocess.Popen([
+        sys.executable, '-m', 'uvicorn', 'app_main:app', '--port', str(args.app_port),
+        '--log-level', 'warning', '--workers', str(args.app_workers),
+    ], env=env, stdout=subprocess.DEVNULL, stderr=open('app.log', 'w'))  # The app logs every response
+    print(f"App log: {os.path.abspath('app.log')}")
+    wait_until_up(f"http://127.0.0.1:{args.mock_port}/v1/models", mock)
+    wait_until_up(f"http://127.0.0.1:{args.app_port}/", app)
+    return mock, app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to generate load for')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between a user\'s requests')
+    parser.add_argument('--search-share', type=float, default=0.3)
+    parser.add_argument('--profile-share', type=float, default=0.05)
+    parser.add_argument('--misspelled-share', type=float, default=0.1)
+    parser.add_argument('--known-share', type=float, default=0.7)
+    parser.add_argument('--daily-target', type=int, default=10)
+    parser.add_argument('--batch-quiz', action='store_true', help='Take quizzes through /quiz/next and /quiz/marks')
+    parser.add_argument('--dictionary-size', type=int, default=100000,
+                        help='Synthetic dictionary size; searched words are drawn from its most frequent 5000 words')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--spawn', action='store_true', help='Start the mock OpenAI server and the app locally')
+    parser.add_argument('--app-port', type=int, default=8000)
+    parser.add_argument('--app-workers', type=int, default=1)
+    parser.add_argument('--mock-port', type=int, default=9000)
+    parser.add_argument('--mock-latency', default='lognormal:0.5:0.6')
+    parser.add_argument('--mock-error-rate', type=float, default=0.0)
+    parser.add_argument('--mock-rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--mock-max-rps', type=float, default=0.0,
+                        help='Requests per second the mock server accepts before answering 429')
+    args = parser.parse_args()
+
+    if args.output:
+        args.output = os.path.abspath(args.output)  # --spawn changes into the workspace
+    processes = ()
+    url = args.url
+    if args.spawn:
+        processes = spawn(args)
+        url = f"http://127.0.0.1:{args.app_port}"
+    try:
+        generator = LoadGenerator(
+            url, args.users, args.duration, synthetic_words(min(args.dictionary_size, 5000)),
+            search_share=args.search_share, profile_share=args.profile_share,
+            misspelled_share=args.misspelled_share, known_share=args.known_share,
+            daily_target=args.daily_target, think_time=args.think_time, batch_quiz=args.batch_quiz,
+        )
+        report = asyncio.run(generator.run())
+        if args.spawn:
+            report['mock_openai'] = httpx.get(f"http://127.0.0.1:{args.mock_port}/stats").json()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print(f"{report['requests']} requests from {report['users']} users in {report['elapsed_seconds']:.1f}s "
+          f"({report['requests_per_second']:.1f} req/s)")
+    if 'mock_openai' in report:
+        print(f"Mock OpenAI server: {report['mock_openai']['requests']} requests, "
+              f"{report['mock_openai']['rate_limited']} rate limited")
+    print(f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<20}{stats['requests']:>10}{stats['errors']:>8}{stats['requests_per_second']:>9.1f}"
+              f"{stats['p50_seconds'] * 1000:>10.1f}{stats['p95_seconds'] * 1000:>10.1f}"
+              f"{stats['p99_seconds'] * 1000:>10.1f}")
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
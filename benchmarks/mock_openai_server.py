@@ -0,0 +1,181 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` with the same canned replies as the fake
+clients in ``benchmarks.common`` (including batched JSON answers and streaming),
+after a latency drawn from a configurable distribution, and fails a configurable
+share of requests with 429 (with Retry-After) or 500. With ``--max-rps`` it also
+enforces a requests-per-second limit like the real API, answering requests over
+it with 429 and the time until capacity frees up. Point the app at it with
+``OPENAI_BASE_URL``:
+
+    python -m benchmarks.mock_openai_server --port 9000 --latency lognormal:0.5:0.6 --rate-limit-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=mock uvicorn app_main:app
+
+Latency specs: ``constant:SECONDS``, ``uniform:LOW:HIGH``, ``lognormal:MEDIAN:SIGMA``
+and ``exponential:MEAN``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.common import reply_for
+
+
+def latency_sampler(spec):
+    kind, *params = spec.split(':')
+    params = [float(param) for param in params]
+    if kind == 'constant':
+        return lambda: params[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(params[0], params[1])
+    if kind == 'lognormal':
+        return lambda: random.lognormvariate(math.log(params[0]), params[1])
+    if kind == 'exponential':
+        return lambda: random.expovariate(1 / params[0])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def count_tokens(text):
+    # Rough estimate, good enough for token accounting in load tests
+    return max(1, len(text) // 4)
+
+
+def rate_limit_response(retry_after):
+    return JSONResponse(
+        {'error': {'message': 'Rate limit reached (mock).', 'type': 'rate_limit_error', 'code': 'rate_limit_exceeded'}},
+        status_code=429,
+        headers={'Retry-After': str(math.ceil(retry_after)), 'retry-after-ms': str(int(retry_after * 1000))}
+    )
+
+
+def create_app(latency='constant:0.3', error_rate=0.0, rate_limit_rate=0.0, stream_chunks=8, max_rps=0.0):
+    sample_latency = latency_sampler(latency)
+    ids = itertools.count(1)
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.rate_limited = 0
+    # Token bucket holding one second of requests
+    bucket = {'tokens': max_rps, 'updated': time.monotonic()}
+
+    def over_limit():
+        # Seconds until a request would be admitted, or 0 if this one is
+        if not max_rps:
+            return 0
+        now = time.monotonic()
+        bucket['tokens'] = min(max_rps, bucket['tokens'] + (now - bucket['updated']) * max_rps)
+        bucket['updated'] = now
+        if bucket['tokens'] < 1:
+            return (1 - bucket['tokens']) / max_rps
+        bucket['tokens'] -= 1
+        return 0
+
+    def error_response():
+        wait = over_limit()
+        if wait:
+            app.state.rate_limited += 1
+            return rate_limit_response(wait)
+        draw = random.random()
+        if draw < rate_limit_rate:
+            app.state.rate_limited += 1
+            return rate_limit_response(1)
+        if draw < rate_limit_rate + error_rate:
+            return JSONResponse(
+                {'error': {'message': 'The server had an error (mock).', 'type': 'server_error', 'code': None}},
+                status_code=500
+            )
+        return None
+
+    @app.post('/v1/chat/completions')
+    async def chat_completions(request: Request):
+        app.state.requests += 1
+        body = await request.json()
+        error = error_response()
+        if error is not None:
+            await asyncio.sleep(min(sample_latency(), 0.05))
+            return error
+
+        model = body.get('model', 'mock')
+        content = reply_for(body['messages'])
+        completion_id = f"chatcmpl-mock-{next(ids)}"
+        created = int(time.time())
+        delay = sample_latency()
+
+        if not body.get('stream'):
+            await asyncio.sleep(delay)
+            prompt_tokens = sum(count_tokens(message.get('content') or '') for message in body['messages'])
+            completion_tokens = count_tokens(content)
+            return {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens,
+                },
+            }
+
+        size = max(1, math.ceil(len(content) / stream_chunks))
+        pieces = [content[start:start + size] for start in range(0, len(content), size)]
+
+        def chunk(delta, finish_reason=None):
+            return 'data: ' + json.dumps({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }) + '\n\n'
+
+        async def events():
+            yield chunk({'role': 'assistant', 'content': ''})
+            for piece in pieces:
+                await asyncio.sleep(delay / len(pieces))
+                yield chunk({'content': piece})
+            yield chunk({}, 'stop')
+            yield 'data: [DONE]\n\n'
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.get('/v1/models')
+    async def models():
+        return {'object': 'list', 'data': [{'id': 'gpt-3.5-turbo', 'object': 'model', 'owned_by': 'mock'}]}
+
+    @app.get('/stats')
+    async def stats():
+        return {'requests': app.state.requests, 'rate_limited': app.state.rate_limited}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', default='constant:0.3', help='Latency distribution, e.g. lognormal:0.5:0.6')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--stream-chunks', type=int, default=8)
+    parser.add_argument('--max-rps', type=float, default=0.0, help='Requests per second above which to answer 429')
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(args.latency, args.error_rate, args.rate_limit_rate, args.stream_chunks, args.max_rps)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Replay a captured request log against the app_main API.
+
+Reads a JSONL file written with ``REQUEST_CAPTURE_FILE`` and sends each message at
+its original offset from the first one, divided by ``--speed``. Each user's
+messages are sent one after another, in their captured order, so a quiz is never
+answered before it was started; different users run concurrently. Reports
+latency percentiles and how far the replay fell behind the schedule.
+
+    python -m benchmarks.replay_requests captured_requests.jsonl --url http://127.0.0.1:8000 --speed 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.load_generator import percentile
+
+
+def read_log(path, user_offset=0):
+    # user_id -> [(offset seconds, endpoint, message)] in captured order
+    users = {}
+    first_ts = None
+    with open(path, encoding='utf-8') as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if first_ts is None or entry['ts'] < first_ts:
+                first_ts = entry['ts']
+            users.setdefault(entry['user_id'] + user_offset, []).append(
+                (entry['ts'], entry.get('endpoint', '/chatbot'), entry['message'])
+            )
+    for user_id, entries in users.items():
+        # Stable sort: lines flushed by different workers may be slightly out of order
+        entries.sort(key=lambda entry: entry[0])
+        users[user_id] = [(ts - first_ts, endpoint, message) for ts, endpoint, message in entries]
+    return users
+
+
+class Replayer:
+    def __init__(self, url, users, speed=1.0, timeout=60.0):
+        self.url = url
+        self.users = users
+        self.speed = speed
+        self.timeout = timeout
+        self.latencies = []
+        self.lags = []
+        self.errors = 0
+
+    async def send(self, client, user_id, endpoint, message):
+        payload = {'user_id': user_id, 'message': message}
+        if endpoint == '/chatbot/stream':
+            async with client.stream('POST', endpoint, json=payload) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+                return response.status_code < 400
+        response = await client.post(endpoint, json=payload)
+        return response.status_code < 400
+
+    async def replay_user(self, client, user_id, entries, start):
+        for offset, endpoint, message in entries:
+            scheduled = start + offset / self.speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            # Positive when the previous reply of this user, or the event loop, held the request back
+            self.lags.append(sent - scheduled)
+            try:
+                ok = await self.send(client, user_id, endpoint, message)
+            except httpx.HTTPError:
+                ok = False
+            self.latencies.append(time.perf_counter() - sent)
+            self.errors += not ok
+
+    async def run(self):
+        limits = httpx.Limits(max_connections=max(10, len(self.users)))
+        async with httpx.AsyncClient(base_url=self.url, timeout=self.timeout, limits=limits) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                self.replay_user(client, user_id, entries, start) for user_id, entries in self.users.items()
+            ))
+            elapsed = time.perf_counter() - start
+        scheduled = max((entries[-1][0] for entries in self.users.values()), default=0.0) / self.speed
+        return {
+            'users': len(self.users),
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'speed': self.speed,
+            'scheduled_seconds': scheduled,
+            'elapsed_seconds': elapsed,
+            'requests_per_second': len(self.latencies) / elapsed if elapsed else 0.0,
+            'p50_seconds': percentile(self.latencies, 0.50),
+            'p95_seconds': percentile(self.latencies, 0.95),
+            'p99_seconds': percentile(self.latencies, 0.99),
+            'p95_lag_seconds': percentile(self.lags, 0.95),
+            'max_lag_seconds': max(self.lags, default=0.0),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('log', help='JSONL file captured with REQUEST_CAPTURE_FILE')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed; 10 plays the log 10x faster')
+    parser.add_argument('--user-offset', type=int, default=0,
+                        help='Added to every user_id, to replay into fresh profiles')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    report = asyncio.run(Replayer(args.url, read_log(args.log, args.user_offset), args.speed).run())
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,45 +1,56 @@
 import gradio as gr
 from language_learning_manager import LanguageLearningManager
+import logging
 import os
 import pandas as pd
-import pdb
 
 # Disable Gradio analytics
 os.environ['GRADIO_ANALYTICS_ENABLED'] = 'False'
 
+logger = logging.getLogger(__name__)
+
 manager = LanguageLearningManager()
 
+def stream_word(history, parts):
+    # Grow the last chat message as pieces of the word info arrive
+    history.append(("Word", ""))
+    text = ""
+    for part in parts:
+        text += part
+        history[-1] = ("Word", text)
+        yield history
+
 def chat(message, history):
     try:
         if message.lower() == "daily quiz":
-            word_info = manager.daily_word_quiz()
-            if word_info:
+            manager.start_quiz()
+            if manager.peek_next_quiz_word() is not None:
                 history.append(("System", "Here's your first word:"))
-                history.append(("Word", word_info))
-                return "", history, gr.update(visible=True), gr.update(visible=True), gr.update(visible=True)
+                for history in stream_word(history, manager.get_next_quiz_word_stream()):
+                    yield "", history, gr.update(visible=True), gr.update(visible=True), gr.update(visible=True)
             else:
                 history.append(("System", "No more words in the quiz."))
-                return "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+                yield "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
         elif message.strip().endswith('?'):
             # Handle searched word
             searched_word = message.strip()[:-1]  # Remove the question mark and any trailing spaces
-            word_info = manager.get_word_info(searched_word, is_searched=True)
-            if "not recognized as a Dutch word" in word_info:
-                history.append(("System", word_info))
+            if not manager.is_dutch_word(manager.word_validator.normalize(searched_word) or searched_word):
+                history.append(("System", manager.unrecognized_word_message(searched_word)))
+                yield "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
             else:
                 history.append(("System", f"Here's the information for '{searched_word}':"))
-                history.append(("Word", word_info))
-            return "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+                for history in stream_word(history, manager.get_word_info_stream(searched_word, is_searched=True)):
+                    yield "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
         else:
             # Handle other chat messages here
             response = "I'm here to help you learn Dutch. Type 'daily quiz' to start a quiz or end your message with '?' to search for a word."
             history.append((message, response))
-            return "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+            yield "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
 
     except Exception as e:
         error_message = f"An error occurred: {str(e)}"
         history.append(("System", error_message))
-        return "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+        yield "", history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
 
 def submit_quiz(is_known, history):
     try:
@@ -53,20 +64,20 @@ def submit_quiz(is_known, history):
         for milestone in achieved_milestones:
             history.append(("System", milestone))
         
-        word_info = manager.get_next_quiz_word()
-        if word_info:
+        if manager.peek_next_quiz_word() is not None:
             history.append(("System", "Here's the next word:"))
-            history.append(("Word", word_info))
-            return history, gr.update(visible=True), gr.update(visible=True), gr.update(visible=True)
+            for history in stream_word(history, manager.get_next_quiz_word_stream()):
+                yield history, gr.update(visible=True), gr.update(visible=True), gr.update(visible=True)
         else:
-            print("Quiz completed. 10 unknown words encountered.")  # Debugging statement
+            manager.cancel_prefetch()
+            logger.info("Quiz completed. 10 unknown words encountered.")
             history.append(("System", "Quiz completed. You have encountered 10 unknown words. Type 'daily quiz' to start a new one."))
-            return history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+            yield history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
     except Exception as e:
         error_message = f"An error occurred: {str(e)}"
-        print(error_message)  # Debugging statement
+        logger.exception(error_message)
         history.append(("System", error_message))
-        return history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
+        yield history, gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
 
 def set_target(target):
     manager.set_daily_target(int(target))
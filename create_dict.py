@@ -1,69 +1,119 @@
-import csv
+import argparse
+import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
-import pdb
+from dictionary_store import TIMESTAMP_FORMAT, DictionaryStore
+from persistence import atomic_write
 
 # Function to read words from CSV file
 def read_words_from_csv(file_name):
-    words = []
-    with open(file_name, mode='r', encoding='utf-8') as csv_file:
-        csv_reader = csv.reader(csv_file)
-        next(csv_reader)  # Skip header
-        for row in csv_reader:
-            if len(row) > 0:  # Ensure the row has at least one column
-                words.append(row[0])
-    return words
+    words = pd.read_csv(file_name, usecols=[0], dtype=str, keep_default_na=False).iloc[:, 0]
+    return words[words != ""]
 
 # Function to read word frequencies from CSV file
 def read_word_frequencies_from_csv(file_name):
-    word_frequencies = {}
-    with open(file_name, mode='r', encoding='utf-8') as csv_file:
-        csv_reader = csv.reader(csv_file)
-        next(csv_reader)  # Skip header
-        for row in csv_reader:
-            print(f"Processing row: {row}")  # Debugging output
-            #pdb.set_trace()
-            if len(row) >= 2:  # Ensure the row has at least two columns
-                word = row[0]
-                try:
-                    frequency = int(row[1])
-                except ValueError:
-                    print(f"Invalid frequency value for word '{word}': {row[1]}")
-                    frequency = 0
-                word_frequencies[word] = frequency
-            else:
-                print(f"Skipping invalid row: {row}")  # Skip rows that do not have at least two columns
-    return word_frequencies
+    frame = pd.read_csv(file_name, usecols=[0, 1], dtype={0: str}, keep_default_na=False)
+    frame.columns = ['Word', 'Frequency']
+    frequencies = frame['Frequency']
+    if frequencies.dtype.kind != 'i':
+        # Only parse value by value when the column did not come out as integers
+        frequencies = pd.to_numeric(frequencies, errors='coerce')
+        invalid = frequencies.isna() & (frame['Frequency'] != "")
+        if invalid.any():
+            print(f"{int(invalid.sum())} rows with an invalid frequency value were counted as 0")
+        frequencies = frequencies.fillna(0).astype('int64')
+    return pd.Series(frequencies.values, index=frame['Word'])
+
+def normalize_words(words):
+    # Join key: NFC-composed and lowercased, so "Één", "één" and a decomposed "één" all match.
+    # Only non-ASCII words can need composing, which keeps the slow path small.
+    keys = pd.Series(words, dtype=str).str.lower()
+    accented = ~keys.str.isascii()
+    keys[accented] = keys[accented].str.normalize('NFC')
+    return keys
+
+def build_dictionary_frame(words, word_frequencies):
+    words = pd.Series(words, dtype=str).reset_index(drop=True)
+    word_frequencies = pd.Series(word_frequencies, dtype='int64')
+
+    # A word takes the frequency of its exact spelling; the last row wins, as in a dict
+    exact = word_frequencies[~word_frequencies.index.duplicated(keep='last')]
+    frequencies = words.map(exact)
+    missing = frequencies.isna().to_numpy()
+    if missing.any():
+        # Words not listed as spelled fall back to the summed frequency of the spellings
+        # that normalize to the same key, e.g. "Één" for "één"
+        codes, keys = pd.factorize(normalize_words(word_frequencies.index))
+        totals = np.bincount(codes, weights=word_frequencies.values, minlength=len(keys)).astype('int64')
+        frequencies[missing] = normalize_words(words[missing]).map(pd.Series(totals, index=keys)).to_numpy()
+    frequencies = frequencies.fillna(0).astype('int64')
+
+    # Sort by frequency in descending order; the stable sort keeps word list order for ties
+    order = (-frequencies).argsort(kind='stable')
+    return pd.DataFrame({'Word': words.values[order], 'Frequency': frequencies.values[order]})
+
+def write_dictionary(dictionary, output_file):
+    atomic_write(output_file, lambda csv_file: dictionary.to_csv(csv_file, index=False), newline='')
 
 # Function to create and populate the Dutch dictionary CSV file
 def create_dutch_dictionary_csv(words, word_frequencies, output_file='dutch_dictionary.csv'):
-    data = []
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-    for word in words:
-        # Get frequency from word_frequencies dictionary, default to 0 if not found
-        frequency = word_frequencies.get(word, 0)
-        if frequency != 0:
-            print(f"Word '{word}' found in frequency file with frequency {frequency}.")
-        data.append([word, frequency, 0, current_time])  # Status set to 0 (unknown)
+    dictionary = build_dictionary_frame(words, word_frequencies)
+    dictionary['Status'] = 0  # Status set to 0 (unknown)
+    dictionary['Last Updated'] = datetime.now().strftime(TIMESTAMP_FORMAT)
+    write_dictionary(dictionary, output_file)
+    print(f"\nDutch dictionary CSV file created and populated at '{output_file}' "
+          f"({len(dictionary)} words, {int((dictionary['Frequency'] > 0).sum())} with a frequency)")
 
-    # Sort the data by frequency in descending order
-    data.sort(key=lambda x: x[1], reverse=True)
+# Function to merge a new word and frequency list into an existing dictionary CSV file
+def merge_dutch_dictionary_csv(words, word_frequencies, output_file='dutch_dictionary.csv'):
+    """Insert new words, update changed frequencies and drop removed words, keeping status
+    and last-updated time of the words that stay. Returns the counts of each kind of change.
+    """
+    dictionary = build_dictionary_frame(words, word_frequencies)
+    existing = pd.read_csv(output_file, dtype={'Word': str, 'Last Updated': str}, keep_default_na=False)
+    existing = existing.drop_duplicates('Word').rename(columns={'Frequency': 'Previous Frequency'})
 
-    # Write the data to a CSV file
-    with open(output_file, mode='w', newline='', encoding='utf-8') as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerow(['Word', 'Frequency', 'Status', 'Last Updated'])  # Write header
-        writer.writerows(data)
+    dictionary = dictionary.merge(existing, on='Word', how='left', sort=False)
+    added = dictionary['Previous Frequency'].isna()
+    changes = {
+        'added': int(added.sum()),
+        'updated': int((~added & (dictionary['Frequency'] != dictionary['Previous Frequency'])).sum()),
+        'removed': int((~existing['Word'].isin(dictionary['Word'])).sum()),
+    }
+    changes['unchanged'] = len(dictionary) - changes['added'] - changes['updated']
 
-    print(f"\nDutch dictionary CSV file created and populated at '{output_file}'")
+    dictionary['Status'] = dictionary['Status'].fillna(0).astype('int64')
+    dictionary['Last Updated'] = dictionary['Last Updated'].fillna(datetime.now().strftime(TIMESTAMP_FORMAT))
+    dictionary = dictionary[['Word', 'Frequency', 'Status', 'Last Updated']]
+    if changes['added'] or changes['updated'] or changes['removed']:
+        write_dictionary(dictionary, output_file)
+    print(f"Merged into '{output_file}': {changes['added']} added, {changes['updated']} updated, "
+          f"{changes['removed']} removed, {changes['unchanged']} unchanged")
+    return changes
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build dutch_dictionary.csv from the word list and frequency list.")
+    parser.add_argument("--merge", action="store_true",
+                        help="Merge into the existing dutch_dictionary.csv, keeping word status and timestamps")
+    parser.add_argument("--store", default=None,
+                        help="With --merge, also apply the changes to this dictionary store database")
+    args = parser.parse_args()
+
     # Read words from dutch_words.csv
     dutch_words = read_words_from_csv('dutch_words.csv')
 
     # Read word frequencies from dutch_word_frequency.csv
     word_frequencies = read_word_frequencies_from_csv('dutch_word_frequency.csv')
 
-    # Create and populate the Dutch dictionary CSV file
-    create_dutch_dictionary_csv(dutch_words, word_frequencies)
\ No newline at end of file
+    if args.merge and os.path.exists('dutch_dictionary.csv'):
+        merge_dutch_dictionary_csv(dutch_words, word_frequencies)
+        if args.store:
+            store = DictionaryStore(args.store)
+            changes = store.sync_words(build_dictionary_frame(dutch_words, word_frequencies).itertuples(index=False))
+            store.close()
+            print(f"Merged into '{args.store}': {changes['added']} added, {changes['updated']} updated, "
+                  f"{changes['removed']} removed, {changes['unchanged']} unchanged")
+    else:
+        # Create and populate the Dutch dictionary CSV file
+        create_dutch_dictionary_csv(dutch_words, word_frequencies)
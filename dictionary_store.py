@@ -0,0 +1,274 @@
+import csv
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from persistence import atomic_write
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Owner of word statuses that are not tied to a user, e.g. the Gradio app and the CSV import
+DEFAULT_USER_ID = 0
+
+
+def file_signature(path):
+    # Changes whenever the file is rewritten; None if it does not exist
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class DictionaryStore:
+    """SQLite-backed storage for the word dictionary.
+
+    The shared ``words`` table holds only (word, frequency). Word status is kept per user
+    in the sparse ``word_status`` table, keyed by (user_id, word), so storage grows with
+    the words each user has touched; ``review_schedule`` holds each user's spaced
+    repetition schedule the same way. With a ``write_behind``, status and schedule
+    updates are buffered and written in one transaction per flush; changes made inside
+    ``batch()`` always end up in the same flush. ``store_meta`` records a
+    version of the words table, renewed whenever it changes, and the signature of the CSV
+    file it was last synced with.
+    """
+
+    def __init__(self, db_path='dictionary_store.db', write_behind=None):
+        self.db_path = db_path
+        self.write_behind = write_behind
+        self._pending_status = {}
+        self._pending_schedule = {}
+        self._lock = threading.Lock()
+        # Held by batch() and flush(), so a flush never writes part of a batch
+        self._batch_lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS words
+        (word TEXT PRIMARY KEY, frequency INTEGER NOT NULL)
+        ''')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS word_status
+        (user_id INTEGER NOT NULL, word TEXT NOT NULL, status INTEGER NOT NULL, last_updated TEXT NOT NULL,
+         PRIMARY KEY (user_id, word))
+        ''')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS review_schedule
+        (user_id INTEGER NOT NULL, word TEXT NOT NULL, repetitions INTEGER NOT NULL, interval_days REAL NOT NULL,
+         ease REAL NOT NULL, due REAL NOT NULL, PRIMARY KEY (user_id, word))
+        ''')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._migrate_global_status()
+        self._conn.commit()
+
+    def _migrate_global_status(self):
+        # Stores created before per-user status kept a single status column on the words table
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(words)')]
+        if 'status' in columns:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO word_status (user_id, word, status, last_updated) '
+                'SELECT ?, word, status, last_updated FROM words WHERE status != 0', (DEFAULT_USER_ID,)
+            )
+            self._conn.execute('DROP INDEX IF EXISTS idx_words_status_frequency')
+            self._conn.execute('ALTER TABLE words DROP COLUMN status')
+            self._conn.execute('ALTER TABLE words DROP COLUMN last_updated')
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM words LIMIT 1').fetchone() is None
+
+    def import_csv(self, csv_file_path):
+        known = []
+
+        def rows(csv_reader):
+            for word, frequency, status, last_updated in csv_reader:
+                if int(status) != 0:
+                    known.append((DEFAULT_USER_ID, word, int(status), last_updated))
+                yield word, int(frequency)
+
+        with open(csv_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file)
+            next(csv_reader)  # Skip header
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO words (word, frequency) VALUES (?, ?)', rows(csv_reader)
+                )
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO word_status (user_id, word, status, last_updated) VALUES (?, ?, ?, ?)',
+                    known
+                )
+                self._renew_words_version()
+                self._set_meta('csv_signature', file_signature(csv_file_path))
+
+    def _get_meta(self, key):
+        row = self._conn.execute('SELECT value FROM store_meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            'INSERT INTO store_meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+            (key, value)
+        )
+
+    def _renew_words_version(self):
+        self._set_meta('words_version', uuid.uuid4().hex)
+
+    def words_version(self):
+        # 16 bytes identifying the current content of the words table
+        with self._lock, self._conn:
+            version = self._get_meta('words_version')
+            if version is None:
+                version = uuid.uuid4().hex
+                self._set_meta('words_version', version)
+        return bytes.fromhex(version)
+
+    def csv_changed(self, csv_file_path):
+        signature = file_signature(csv_file_path)
+        with self._lock:
+            return signature is not None and signature != self._get_meta('csv_signature')
+
+    def sync_csv(self, csv_file_path):
+        # Apply the words and frequencies of a rebuilt CSV; word status in the store is kept
+        with open(csv_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file)
+            next(csv_reader)  # Skip header
+            changes = self.sync_words((row[0], row[1]) for row in csv_reader if row)
+        with self._lock, self._conn:
+            self._set_meta('csv_signature', file_signature(csv_file_path))
+        return changes
+
+    def sync_words(self, rows):
+        """Make the words table match ``rows`` of (word, frequency): insert new words, update
+        changed frequencies and delete words no longer listed. Word status rows are kept, so
+        progress on a word survives it being dropped and listed again. Returns change counts.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('CREATE TEMP TABLE incoming_words (word TEXT PRIMARY KEY, frequency INTEGER NOT NULL)')
+            try:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO incoming_words (word, frequency) VALUES (?, ?)',
+                    ((word, int(frequency)) for word, frequency in rows)
+                )
+                changes = {
+                    'removed': self._conn.execute(
+                        'DELETE FROM words WHERE word NOT IN (SELECT word FROM incoming_words)'
+                    ).rowcount,
+                    'updated': self._conn.execute(
+                        'UPDATE words SET frequency = i.frequency FROM incoming_words i '
+                        'WHERE i.word = words.word AND i.frequency != words.frequency'
+                    ).rowcount,
+                    'added': self._conn.execute(
+                        'INSERT INTO words (word, frequency) SELECT word, frequency FROM incoming_words '
+                        'WHERE word NOT IN (SELECT word FROM words) ORDER BY frequency DESC, rowid'
+                    ).rowcount,
+                }
+                total = self._conn.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+                if changes['removed'] or changes['updated'] or changes['added']:
+                    self._renew_words_version()
+            finally:
+                self._conn.execute('DROP TABLE incoming_words')
+        changes['unchanged'] = total - changes['added'] - changes['updated']
+        return changes
+
+    def load_rows(self):
+        # (word, frequency) tuples in descending frequency order
+        with self._lock:
+            yield from self._conn.execute('SELECT word, frequency FROM words ORDER BY frequency DESC, rowid')
+
+    def load_user_status(self, user_id):
+        # (word, status, last_updated) tuples for the words this user has marked
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                'SELECT word, status, last_updated FROM word_status WHERE user_id = ?', (user_id,)
+            ).fetchall()
+
+    def load_schedule(self, user_id):
+        # (word, repetitions, interval_days, ease, due) tuples for the words this user has reviewed
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                'SELECT word, repetitions, interval_days, ease, due FROM review_schedule WHERE user_id = ?',
+                (user_id,)
+            ).fetchall()
+
+    def set_status(self, user_id, word, status, last_updated):
+        with self._lock:
+            self._pending_status[(user_id, word)] = (
+                user_id, word, status, last_updated.strftime(TIMESTAMP_FORMAT)
+            )
+        self._mark_dirty()
+
+    def set_schedule(self, user_id, word, schedule):
+        # schedule: (repetitions, interval_days, ease, due) as kept by ReviewScheduler
+        with self._lock:
+            self._pending_schedule[(user_id, word)] = (user_id, word) + tuple(schedule)
+        self._mark_dirty()
+
+    @contextmanager
+    def batch(self):
+        with self._batch_lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        if self._batch_depth:
+            return  # The batch marks the store dirty once it ends
+        if self.write_behind is None:
+            self.flush()
+        else:
+            self.write_behind.mark_dirty(self.db_path, self.flush)
+
+    def flush(self):
+        with self._batch_lock, self._lock:
+            if not self._pending_status and not self._pending_schedule:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO word_status (user_id, word, status, last_updated) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (user_id, word) DO UPDATE SET status = excluded.status, '
+                    'last_updated = excluded.last_updated',
+                    self._pending_status.values()
+                )
+                self._conn.executemany(
+                    'INSERT INTO review_schedule (user_id, word, repetitions, interval_days, ease, due) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (user_id, word) DO UPDATE SET repetitions = excluded.repetitions, '
+                    'interval_days = excluded.interval_days, ease = excluded.ease, due = excluded.due',
+                    self._pending_schedule.values()
+                )
+            self._pending_status = {}
+            self._pending_schedule = {}
+
+    def export_csv(self, csv_file_path, user_id=DEFAULT_USER_ID):
+        self.flush()
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+
+        def write(csv_file):
+            writer = csv.writer(csv_file)
+            writer.writerow(['Word', 'Frequency', 'Status', 'Last Updated'])
+            writer.writerows(self._conn.execute(
+                'SELECT w.word, w.frequency, COALESCE(s.status, 0), COALESCE(s.last_updated, ?) '
+                'FROM words w LEFT JOIN word_status s ON s.user_id = ? AND s.word = w.word '
+                'ORDER BY w.frequency DESC, w.rowid',
+                (now, user_id)
+            ))
+
+        with self._lock:
+            atomic_write(csv_file_path, write, newline='')
+            # The export has the store's words, so it must not trigger a sync on the next start
+            with self._conn:
+                self._set_meta('csv_signature', file_signature(csv_file_path))
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
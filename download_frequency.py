@@ -1,7 +1,8 @@
 import requests
 import csv
 import re
-import pdb
+from ingestion import iter_lines, with_progress
+from persistence import atomic_write
 
 # URL of the Dutch frequency list CSV file
 # Replace with the actual URL of the Dutch frequency data
@@ -12,45 +13,49 @@ csv_file_name = "dutch_word_frequency.csv"
 
 def download_csv(url, file_name):
     try:
-        # Send a GET request to the URL
-        response = requests.get(url)
-        # Raise an error for bad status codes
-        response.raise_for_status()
+        # Stream the response to disk in chunks instead of holding it in memory
+        with requests.get(url, stream=True) as response:
+            # Raise an error for bad status codes
+            response.raise_for_status()
 
-        # Write the content to a CSV file
-        with open(file_name, "wb") as file:
-            file.write(response.content)
+            def write(file):
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    file.write(chunk)
+
+            atomic_write(file_name, write, binary=True)
 
         print(f"CSV file downloaded successfully and saved as '{file_name}'")
     except requests.exceptions.RequestException as e:
         print(f"Error downloading the file: {e}")
 
-def process_csv(file_name, output_file_name):
-    try:
-        with open(file_name, mode='r', encoding='utf-8') as csv_file:
-            lines = csv_file.readlines()
-            header = ['Word', 'Frequency']  # Define the header
+def parse_frequency_lines(lines):
+    # Yield (word, frequency) pairs from "word frequency" lines
+    for line in lines:
+        row = re.split(r'\s+', line.strip())  # Split by one or more spaces
+        if len(row) >= 2:  # Ensure the row has at least two columns
+            word = row[0]
+            try:
+                frequency = int(row[1])
+            except ValueError:
+                print(f"Invalid frequency value for word '{word}': {row[1]}")
+                frequency = 0
+            yield word, frequency
+        elif row != ['']:
+            print(f"Skipping invalid row: {row}")  # Skip rows that do not have at least two columns
 
-            with open(output_file_name, mode='w', newline='', encoding='utf-8') as output_file:
-                writer = csv.writer(output_file)
-                writer.writerow(header)  # Write the header
+def process_csv(source, output_file_name, progress_interval=5.0):
+    # source is a file path or any iterable of lines; it may be the same path as the output,
+    # since the output is written to a temporary file and swapped in at the end
+    try:
+        header = ['Word', 'Frequency']  # Define the header
 
-                for index, line in enumerate(lines):
-                    print(f"Processing line: {line.strip()}")  # Debugging output
-                    row = re.split(r'\s+', line.strip())  # Split by one or more spaces
-                    if len(row) >= 2:  # Ensure the row has at least two columns
-                        word = row[0]
-                        try:
-                            frequency = int(row[1])
-                        except ValueError:
-                            print(f"Invalid frequency value for word '{word}': {row[1]}")
-                            frequency = 0
-                        writer.writerow([word, frequency])
-                        if (index + 1) % 100 == 0:
-                            print(f"{index + 1} words processed: {row}")
-                    else:
-                        print(f"Skipping invalid row: {row}")  # Skip rows that do not have at least two columns
+        def write(output_file):
+            writer = csv.writer(output_file)
+            writer.writerow(header)  # Write the header
+            lines = with_progress(iter_lines(source), "Frequency list", progress_interval)
+            writer.writerows(parse_frequency_lines(lines))
 
+        atomic_write(output_file_name, write, newline='')
         print(f"\nProcessed CSV file saved as '{output_file_name}'")
         
         # Verify the output file
@@ -61,9 +66,16 @@ def process_csv(file_name, output_file_name):
     except Exception as e:
         print(f"Error processing the file: {e}")
 
-if __name__ == "__main__":
-    # Download the CSV file
-    download_csv(url, csv_file_name)
+def download_and_process(url, output_file_name):
+    # Parse the frequency list while it downloads, without a raw copy on disk
+    try:
+        with requests.get(url, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            process_csv(response.iter_lines(decode_unicode=True), output_file_name)
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading the file: {e}")
 
-    # Process the CSV file and output progress every 100 words
-    process_csv(csv_file_name, csv_file_name)
+if __name__ == "__main__":
+    # Download the frequency list and convert it to CSV in one streaming pass
+    download_and_process(url, csv_file_name)
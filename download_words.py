@@ -1,31 +1,34 @@
 import requests
 import csv
+from ingestion import with_progress
+from persistence import atomic_write
 
 # URL of the OpenTaal word list
 word_list_url = 'https://raw.githubusercontent.com/OpenTaal/opentaal-wordlist/master/wordlist.txt'
 
 # Function to download the word list
 def download_word_list(url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.text.splitlines()  # Return as a list of words
-    else:
-        print("Failed to download the word list.")
-        return []
+    # Yields words as they arrive instead of buffering the whole list
+    with requests.get(url, stream=True) as response:
+        if response.status_code == 200:
+            response.encoding = 'utf-8'
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield line
+        else:
+            print("Failed to download the word list.")
 
 # Function to filter out numeric words
 def filter_words(words):
-    return [word for word in words if not any(char.isdigit() for char in word)]
+    return (word for word in words if not any(char.isdigit() for char in word))
 
-def save_to_csv(words, csv_filename='dutch_words.csv'):
-    with open(csv_filename, mode='w', newline='', encoding='utf-8') as csv_file:
+def save_to_csv(words, csv_filename='dutch_words.csv', progress_interval=5.0):
+    def write(csv_file):
         writer = csv.writer(csv_file)
         writer.writerow(['Word'])  # Write header
-        for index, word in enumerate(words):
-            writer.writerow([word])  # Write each word in a new row
-            if (index + 1) % 100 == 0:
-                print(f"{index + 1} words processed: {words[index - 99:index + 1]}")
+        writer.writerows([word] for word in with_progress(words, "Word list", progress_interval))
 
+    atomic_write(csv_filename, write, newline='')
     print(f"\nWord list saved to {csv_filename}")
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+import os
+import time
+
+
+def iter_lines(source, encoding='utf-8'):
+    """Yield the lines of a local file path or any iterable of lines (file object, HTTP line iterator).
+
+    Nothing is read ahead, so memory use does not depend on the size of the source.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, mode='r', encoding=encoding) as source_file:
+            yield from source_file
+    else:
+        for line in source:
+            yield line.decode(encoding) if isinstance(line, bytes) else line
+
+
+def with_progress(items, label, interval=5.0):
+    """Pass ``items`` through, printing a progress line at most every ``interval`` seconds."""
+    count = 0
+    start = last_report = time.monotonic()
+    for item in items:
+        count += 1
+        yield item
+        if count % 4096 == 0:
+            now = time.monotonic()
+            if now - last_report >= interval:
+                print(f"{label}: {count} processed ({count / (now - start):.0f}/s)")
+                last_report = now
+    print(f"{label}: {count} processed in {time.monotonic() - start:.1f}s")
@@ -1,70 +1,319 @@
+import asyncio
 import json
 import os
 from datetime import datetime
-import csv
 import threading
-from openai import OpenAI
-import openai
-import pandas as pd
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import metrics
+from dictionary_store import DEFAULT_USER_ID, DictionaryStore
+from persistence import get_write_behind
+from rate_limiter import AdaptiveLimiter
+from review_scheduler import ReviewScheduler
+from search_history import SearchHistory
+from single_flight import SingleFlight
+from user_profile_setting import get_user_profile, increment_words_learned, init_db, update_user_profile
+from user_word_status import UserWordStatus
+from word_dictionary import WordDictionary, snapshot_matches, write_snapshot
+from word_info_cache import cache_from_env
+from word_validator import DutchWordValidator
+
+# Bump these whenever the corresponding prompt changes so stale cached answers are not reused.
+# Single and batched word info prompts render to the same text, so they share a version.
+IS_DUTCH_PROMPT_VERSION = 'is_dutch-v1'
+WORD_INFO_PROMPT_VERSION = 'word_info-v1'
+
+HELP_MESSAGE = "I'm here to help you learn Dutch. Type 'daily quiz' to start a quiz or end your message with '?' to search for a word."
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+# 0 disables the token bucket; the concurrency limit still backs off on rate limiting
+OPENAI_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_REQUESTS_PER_SECOND", "0"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+# Any OpenAI-compatible endpoint, e.g. the local stand-in in benchmarks/mock_openai_server.py
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+QUIZ_PREFETCH_DEPTH = int(os.getenv("QUIZ_PREFETCH_DEPTH", "3"))
+QUIZ_PREFETCH_WORKERS = int(os.getenv("QUIZ_PREFETCH_WORKERS", "8"))
+WORD_INFO_BATCH_SIZE = int(os.getenv("WORD_INFO_BATCH_SIZE", "10"))
+SEARCH_HISTORY_MAX_SIZE = int(os.getenv("SEARCH_HISTORY_MAX_SIZE", "5000"))
+SPELLING_VOCABULARY_SIZE = int(os.getenv("SPELLING_VOCABULARY_SIZE", "20000"))
+# Ask the LLM about words missing from the local word list instead of rejecting them
+DUTCH_WORD_LLM_FALLBACK = os.getenv("DUTCH_WORD_LLM_FALLBACK", "0") == "1"
+
+DICTIONARY_CSV_FILE = 'dutch_dictionary.csv'
+# Binary copy of the words table for fast start-up; rewritten whenever the table changes
+DICTIONARY_SNAPSHOT_FILE = os.getenv("DICTIONARY_SNAPSHOT_FILE", "dictionary_snapshot.bin")
+SEARCH_HISTORY_FILE = 'search_history.csv'
+
+# Shared by every manager in the process so the limits are per worker, not per request
+_async_openai_client = None
+_openai_limiter = None
+_single_flight = None
+_prefetch_executor = None
+
+# Loaded once per process and shared by all user sessions
+_openai_client = None
+_word_info_cache = None
+_dictionary_store = None
+_shared_dictionary = None
+_search_histories = {}
+# Managers holding each user's search history; it is closed when the last one releases it
+_search_history_references = {}
+_word_validator = None
+_profile_db_ready = False
+_shared_lock = threading.RLock()
+
+def search_history_file(user_id):
+    # The default user keeps the original file; every other user gets its own
+    if user_id == DEFAULT_USER_ID:
+        return SEARCH_HISTORY_FILE
+    root, extension = os.path.splitext(SEARCH_HISTORY_FILE)
+    return f"{root}_{user_id}{extension}"
+
+def get_openai_client():
+    global _openai_client
+    with _shared_lock:
+        if _openai_client is None:
+            from openai import OpenAI  # Imported on first use; the package is slow to import
+            # Retries go through the shared limiter, which needs to see every rate limited call
+            _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL, max_retries=0)
+        return _openai_client
+
+def get_word_info_cache():
+    global _word_info_cache
+    with _shared_lock:
+        if _word_info_cache is None:
+            _word_info_cache = cache_from_env()
+            cache = _word_info_cache
+            metrics.register_callback(
+                'chat2dutch_word_info_cache_lookups_total', 'Word info cache lookups by result.', 'counter',
+                ['result'], lambda: {('hit',): cache.hits, ('miss',): cache.misses}
+            )
+            metrics.register_callback(
+                'chat2dutch_word_info_cache_entries', 'Entries in the word info cache.', 'gauge',
+                [], lambda: {(): cache.stats()['size']}
+            )
+        return _word_info_cache
+
+def get_dictionary_store():
+    global _dictionary_store
+    with _shared_lock:
+        if _dictionary_store is None:
+            _dictionary_store = DictionaryStore(
+                os.getenv("DICTIONARY_DB_FILE", "dictionary_store.db"), write_behind=get_write_behind()
+            )
+        return _dictionary_store
+
+@metrics.timed(metrics.io_seconds, 'sqlite', 'load_dictionary')
+def load_dictionary(dictionary_store, csv_file_path, snapshot_file_path=None):
+    # The store is authoritative; the CSV is imported into it once and synced again only
+    # when the file is rebuilt (word status lives in the store and is kept)
+    if dictionary_store.is_empty():
+        dictionary_store.import_csv(csv_file_path)
+    elif dictionary_store.csv_changed(csv_file_path):
+        dictionary_store.sync_csv(csv_file_path)
+    version = dictionary_store.words_version()
+    if snapshot_file_path and snapshot_matches(snapshot_file_path, version):
+        return WordDictionary.from_snapshot(snapshot_file_path)
+    dictionary = WordDictionary.from_rows(dictionary_store.load_rows())
+    if snapshot_file_path:
+        write_snapshot(snapshot_file_path, dictionary.words, dictionary.frequencies, version)
+    return dictionary
+
+def get_shared_dictionary():
+    global _shared_dictionary
+    with _shared_lock:
+        if _shared_dictionary is None:
+            _shared_dictionary = load_dictionary(get_dictionary_store(), DICTIONARY_CSV_FILE, DICTIONARY_SNAPSHOT_FILE)
+        return _shared_dictionary
+
+def get_async_openai_client():
+    global _async_openai_client
+    if _async_openai_client is None:
+        from openai import AsyncOpenAI
+        _async_openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL, timeout=OPENAI_TIMEOUT, max_retries=0
+        )
+    return _async_openai_client
+
+def get_openai_limiter():
+    global _openai_limiter
+    with _shared_lock:
+        if _openai_limiter is None:
+            _openai_limiter = AdaptiveLimiter(
+                OPENAI_MAX_CONCURRENCY, rate=OPENAI_REQUESTS_PER_SECOND, max_retries=OPENAI_MAX_RETRIES
+            )
+            limiter = _openai_limiter
+            metrics.register_callback(
+                'chat2dutch_openai_limiter', 'Current OpenAI concurrency limit and calls in flight.', 'gauge',
+                ['value'], lambda: {(name,): value for name, value in limiter.stats().items()
+                                    if name in ('limit', 'in_flight')}
+            )
+            metrics.register_callback(
+                'chat2dutch_openai_limiter_events_total', 'Rate limited and retried OpenAI calls.', 'counter',
+                ['event'], lambda: {(name,): value for name, value in limiter.stats().items()
+                                    if name in ('rate_limited', 'retries')}
+            )
+        return _openai_limiter
+
+def get_single_flight():
+    global _single_flight
+    with _shared_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+            flights = _single_flight
+            metrics.register_callback(
+                'chat2dutch_openai_coalesced_total', 'OpenAI lookups by whether they made the call or shared one.',
+                'counter', ['role'], lambda: {('leader',): flights.leaders, ('follower',): flights.followers}
+            )
+        return _single_flight
+
+def get_prefetch_executor():
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        _prefetch_executor = ThreadPoolExecutor(max_workers=QUIZ_PREFETCH_WORKERS, thread_name_prefix="quiz-prefetch")
+    return _prefetch_executor
+
+def get_word_validator():
+    global _word_validator
+    with _shared_lock:
+        if _word_validator is None:
+            _word_validator = DutchWordValidator(get_shared_dictionary(), vocabulary_size=SPELLING_VOCABULARY_SIZE)
+        return _word_validator
+
+def get_search_history(user_id=DEFAULT_USER_ID):
+    with _shared_lock:
+        history = _search_histories.get(user_id)
+        if history is None:
+            with metrics.timer(metrics.io_seconds, 'csv', 'load_search_history'):
+                history = _search_histories[user_id] = SearchHistory(
+                    search_history_file(user_id), max_size=SEARCH_HISTORY_MAX_SIZE, write_behind=get_write_behind()
+                )
+        _search_history_references[user_id] = _search_history_references.get(user_id, 0) + 1
+        return history
+
+def release_search_history(user_id):
+    # Compacts and forgets a user's history once no manager holds it; it is reloaded on next use
+    with _shared_lock:
+        references = _search_history_references.get(user_id, 0) - 1
+        if references > 0:
+            _search_history_references[user_id] = references
+            return
+        _search_history_references.pop(user_id, None)
+        history = _search_histories.pop(user_id, None)
+        if history is not None:
+            # Under the lock, so a history reloaded for this user sees the compacted files
+            history.close()
+
+def init_profile_db():
+    global _profile_db_ready
+    with _shared_lock:
+        if not _profile_db_ready:
+            init_db()
+            _profile_db_ready = True
 
 class LanguageLearningManager:
-    def __init__(self):
+    def __init__(self, user_id=None, openai_client=None, async_openai_client=None):
+        self.user_id = user_id
+        # Defaults for users without saved settings
         self.settings_file = 'profile_settings.json'
         self.daily_target = None
         self.milestones_rewards = []
-        self.client, self.model = self.get_openai_connection()
-        self.csv_file_path = 'dutch_dictionary.csv'
-        self.search_history_file = 'search_history.csv'
-        self.dictionary = self.load_dictionary_from_csv()
+        self.model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.csv_file_path = DICTIONARY_CSV_FILE
+        self.dictionary_store = get_dictionary_store()
+        self.status_user_id = DEFAULT_USER_ID if user_id is None else user_id
+        self.search_history_file = search_history_file(self.status_user_id)
+        # The dictionary and everything built on it are loaded on first use
+        self._word_status = None
+        self._review_scheduler = None
+        self.llm_word_check = DUTCH_WORD_LLM_FALLBACK
         self.search_history = self.load_search_history()
         self.words_quiz = []
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._openai_client = openai_client
+        self.async_openai_client = async_openai_client
+        self.openai_timeout = OPENAI_TIMEOUT
         self.current_quiz_words = []
         self.current_quiz_index = 0
+        # Quiz words served and not marked yet; a mark consumes its word
+        self.unmarked_quiz_words = set()
         self.unknown_word_count = 0
+        self.awaiting_mark = False
+        self.prefetch_depth = QUIZ_PREFETCH_DEPTH
+        self.prefetched_word_info = {}
+        self.word_info_batch_size = WORD_INFO_BATCH_SIZE
         self.total_words_learned = 0
-        self.load_data_from_json()  # Load data from JSON file
+        self.word_info_cache = get_word_info_cache()
+        self.message_lock = asyncio.Lock()
+        self.closed = False
+        self.load_settings()
+
+    @property
+    def openai_client(self):
+        return self._openai_client or get_openai_client()
+
+    @property
+    def dictionary(self):
+        return get_shared_dictionary()
+
+    @property
+    def word_validator(self):
+        return get_word_validator()
 
-    def get_openai_connection(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-        client = OpenAI(api_key=api_key)
-        return client, model
+    @property
+    def word_status(self):
+        if self._word_status is None:
+            self._word_status = self.load_word_status()
+        return self._word_status
 
-    def load_data_from_json(self):
+    @property
+    def review_scheduler(self):
+        if self._review_scheduler is None:
+            self._review_scheduler = self.load_review_schedule()
+        return self._review_scheduler
+
+    @metrics.timed(metrics.io_seconds, 'sqlite', 'load_settings')
+    def load_settings(self):
+        # Settings are kept per user in the profile database; a new user starts from the settings file
+        init_profile_db()
+        profile = get_user_profile(self.status_user_id)
+        if profile is not None:
+            self.daily_target = profile['daily_target']
+            self.milestones_rewards = profile['milestones']
+            self.total_words_learned = profile['total_words_learned']
+            return
+        data = {}
         if os.path.exists(self.settings_file):
             with open(self.settings_file, 'r') as f:
                 data = json.load(f)
-                self.daily_target = data.get('daily_target')
-                self.milestones_rewards = data.get('milestones_rewards', [])
-                self.total_words_learned = data.get('total_words_learned', 0)
-        else:
-            self.daily_target = None
-            self.milestones_rewards = []
-            self.total_words_learned = 0
-            self.save_data_to_json()
-
-    def save_data_to_json(self):
-        data = {
-            'daily_target': self.daily_target,
-            'milestones_rewards': self.milestones_rewards,
-            'total_words_learned': self.total_words_learned
-        }
-        with open(self.settings_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.daily_target = data.get('daily_target')
+        self.milestones_rewards = data.get('milestones_rewards', [])
+        self.total_words_learned = 0
+        self.save_settings()
+        if self.status_user_id == DEFAULT_USER_ID:
+            # The file's count belongs to the single user it was written for
+            self.total_words_learned = data.get('total_words_learned', 0)
+            if self.total_words_learned:
+                increment_words_learned(self.status_user_id, self.total_words_learned)
+
+    def save_settings(self):
+        # The learned word count is not part of it; known marks add to it with increment_words_learned
+        update_user_profile(self.status_user_id, daily_target=self.daily_target, milestones=self.milestones_rewards)
 
     def get_daily_target(self):
         return self.daily_target
 
     def set_daily_target(self, target):
         self.daily_target = target
-        self.save_data_to_json()
+        self.save_settings()
         return f"Daily target set to {target} words."
 
     def get_milestones_rewards(self):
+        import pandas as pd  # Only the Gradio settings tab needs pandas
         return pd.DataFrame(self.milestones_rewards, columns=["milestone", "reward"])
 
     def update_milestones_rewards(self, df):
+        import pandas as pd
         # Convert DataFrame to list of dictionaries
         self.milestones_rewards = df.to_dict('records')
         # Filter out empty rows and convert milestone to int
@@ -73,13 +322,12 @@ class LanguageLearningManager:
             for mr in self.milestones_rewards
             if pd.notna(mr["milestone"]) and pd.notna(mr["reward"])
         ]
-        self.save_data_to_json()
+        self.save_settings()
         return "Milestones and rewards updated successfully."
 
     def clear_milestones_rewards(self):
-        self.daily_target = []
         self.milestones_rewards = []
-        self.save_data_to_json()
+        self.save_settings()
         return "All milestones and rewards cleared successfully."
 
     def has_daily_target(self):
@@ -89,101 +337,560 @@ class LanguageLearningManager:
         return len(self.milestones_rewards) > 0
 
     def load_dictionary_from_csv(self):
-        dictionary = []
-        with open(self.csv_file_path, mode='r', encoding='utf-8') as csv_file:
-            csv_reader = csv.reader(csv_file)
-            next(csv_reader)  # Skip header
-            for row in csv_reader:
-                word, frequency, status, last_updated = row
-                dictionary.append({
-                    'word': word,
-                    'frequency': int(frequency),
-                    'status': int(status),
-                    'last_updated': datetime.strptime(last_updated, '%Y-%m-%d %H:%M:%S')
-                })
-        return dictionary
+        return load_dictionary(self.dictionary_store, self.csv_file_path)
+
+    @metrics.timed(metrics.io_seconds, 'sqlite', 'load_word_status')
+    def load_word_status(self):
+        return UserWordStatus.from_rows(self.dictionary, self.dictionary_store.load_user_status(self.status_user_id))
+
+    @metrics.timed(metrics.io_seconds, 'sqlite', 'load_review_schedule')
+    def load_review_schedule(self):
+        scheduler = ReviewScheduler.from_rows(self.dictionary_store.load_schedule(self.status_user_id))
+        # Words marked before spaced repetition was introduced get a schedule from their last mark
+        for word, (status, last_updated) in self.word_status.statuses.items():
+            scheduler.seed(word, status, last_updated)
+        return scheduler
 
     def load_search_history(self):
-        if not os.path.exists(self.search_history_file):
-            return []
-        with open(self.search_history_file, mode='r', encoding='utf-8') as csv_file:
-            return [row[0] for row in csv.reader(csv_file)]
+        return get_search_history(self.status_user_id)
 
+    @metrics.timed(metrics.io_seconds, 'csv', 'save_search_history')
     def save_search_history(self):
-        with open(self.search_history_file, mode='w', newline='', encoding='utf-8') as csv_file:
-            csv_writer = csv.writer(csv_file)
-            for w in self.search_history:
-                csv_writer.writerow([w])
+        self.search_history.compact()
 
+    @metrics.timed(metrics.io_seconds, 'csv', 'save_dictionary')
     def save_dictionary_to_csv(self):
-        with open(self.csv_file_path, mode='w', newline='', encoding='utf-8') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(['Word', 'Frequency', 'Status', 'Last Updated'])
-            for entry in self.dictionary:
-                writer.writerow([
-                    entry['word'],
-                    entry['frequency'],
-                    entry['status'],
-                    entry['last_updated'].strftime('%Y-%m-%d %H:%M:%S')
-                ])
+        # Export only; word status changes are persisted row by row in the store
+        self.dictionary_store.export_csv(self.csv_file_path, self.status_user_id)
 
     def daily_word_quiz(self):
+        self.start_quiz()
+        return self.get_next_quiz_word()
+
+    async def adaily_word_quiz(self):
+        self.start_quiz()
+        return await self.aget_next_quiz_word()
+
+    def start_quiz(self):
         # Check if daily target is set
         if not self.has_daily_target():
             raise ValueError("Daily target must be set before starting the quiz.")   
         # Check if milestones and rewards are set
         if not self.has_milestones_rewards():
             raise ValueError("Milestones and rewards must be set before starting the quiz.")
+        self.cancel_prefetch()
         self.current_quiz_words = self.select_words()
         self.current_quiz_index = 0
+        self.unmarked_quiz_words = set()
         self.unknown_word_count = 0
-        return self.get_next_quiz_word()
+        # Enrich the rest of the quiz in batched background requests while the first word is fetched
+        self.prefetch_quiz_words(1, len(self.current_quiz_words))
 
-    def get_next_quiz_word(self):
+    def peek_next_quiz_word(self):
         if self.unknown_word_count >= 10:
             return None
         if self.current_quiz_index < len(self.current_quiz_words):
-            word = self.current_quiz_words[self.current_quiz_index]
+            return self.current_quiz_words[self.current_quiz_index]
+        return None
+
+    def advance_quiz(self, word):
+        self.current_quiz_index += 1
+        self.unmarked_quiz_words.add(word)
+        self.awaiting_mark = True
+        self.update_search_history(word, False)  # Add to history as unknown
+
+    def get_next_quiz_word(self):
+        word = self.peek_next_quiz_word()
+        if word is None:
+            self.cancel_prefetch()
+            return None
+        self.prefetch_quiz_words(self.current_quiz_index + 1)
+        word_info = self.take_prefetched_word_info(word)
+        if word_info is None:
             word_info = self.get_word_info(word)
-            self.current_quiz_index += 1
-            self.update_search_history(word, False)  # Add to history as unknown
-            return word_info
+        self.advance_quiz(word)
+        return word_info
+
+    async def aget_next_quiz_word(self):
+        word = self.peek_next_quiz_word()
+        if word is None:
+            self.cancel_prefetch()
+            return None
+        self.prefetch_quiz_words(self.current_quiz_index + 1)
+        future = self.prefetched_word_info.get(word)
+        if future is not None and not future.cancelled():
+            # Wait without blocking the event loop; the result is then read below
+            await asyncio.wait([asyncio.wrap_future(future)])
+        word_info = self.take_prefetched_word_info(word)
+        if word_info is None:
+            word_info = await self.aget_word_info(word)
+        self.advance_quiz(word)
+        return word_info
+
+    def get_next_quiz_word_stream(self):
+        word = self.peek_next_quiz_word()
+        if word is None:
+            self.cancel_prefetch()
+            return
+        self.prefetch_quiz_words(self.current_quiz_index + 1)
+        word_info = self.take_prefetched_word_info(word)
+        if word_info is not None:
+            yield word_info
         else:
+            yield from self.get_word_info_stream(word)
+        self.advance_quiz(word)
+
+    async def aget_next_quiz_word_stream(self):
+        word = self.peek_next_quiz_word()
+        if word is None:
+            self.cancel_prefetch()
+            return
+        self.prefetch_quiz_words(self.current_quiz_index + 1)
+        future = self.prefetched_word_info.get(word)
+        if future is not None and not future.cancelled():
+            await asyncio.wait([asyncio.wrap_future(future)])
+        word_info = self.take_prefetched_word_info(word)
+        if word_info is not None:
+            yield word_info
+        else:
+            async for part in self.aget_word_info_stream(word):
+                yield part
+        self.advance_quiz(word)
+
+    async def aget_next_quiz_words(self, count):
+        # Hands out up to count quiz words at once, for clients that mark them together afterwards
+        words = []
+        if self.unknown_word_count < 10:
+            words = self.current_quiz_words[self.current_quiz_index:self.current_quiz_index + count]
+        if not words:
+            self.cancel_prefetch()
+            return []
+        # Fetch the words in batched requests, plus the usual lookahead past them
+        self.prefetch_quiz_words(self.current_quiz_index, len(words) + self.prefetch_depth)
+        word_infos = []
+        for word in words:
+            future = self.prefetched_word_info.get(word)
+            if future is not None and not future.cancelled():
+                await asyncio.wait([asyncio.wrap_future(future)])
+            word_info = self.take_prefetched_word_info(word)
+            if word_info is None:
+                word_info = await self.aget_word_info(word)
+            self.advance_quiz(word)
+            word_infos.append((word, word_info))
+        return word_infos
+
+    def prefetch_quiz_words(self, start, count=None):
+        # Fetch upcoming quiz words in the background so the following clicks hit the cache
+        count = self.prefetch_depth if count is None else count
+        pending = [
+            word for word in self.current_quiz_words[start:start + count]
+            if word not in self.prefetched_word_info
+        ]
+        executor = get_prefetch_executor()
+        for i in range(0, len(pending), self.word_info_batch_size):
+            batch = pending[i:i + self.word_info_batch_size]
+            future = executor.submit(self.get_word_info_batch, batch)
+            for word in batch:
+                self.prefetched_word_info[word] = future
+
+    def take_prefetched_word_info(self, word):
+        future = self.prefetched_word_info.pop(word, None)
+        if future is None or future.cancelled():
             return None
+        try:
+            return future.result().get(word)
+        except Exception:
+            return None  # The caller falls back to a direct lookup
+
+    def cancel_prefetch(self):
+        for future in self.prefetched_word_info.values():
+            future.cancel()
+        self.prefetched_word_info = {}
 
     def select_words(self):
-        prioritized_words = []
-        # First, select from search history if it exists
-        if os.path.exists(self.search_history_file):
+        # First, the words due for review, earliest due first
+        prioritized_words = [
+            word for word in self.review_scheduler.due(self.daily_target) if word in self.dictionary
+        ]
+        # Then searched words that have not been reviewed yet
+        if len(prioritized_words) < self.daily_target:
+            selected = set(prioritized_words)
             for word in self.search_history:
-                dict_entry = next((entry for entry in self.dictionary if entry['word'] == word), None)
-                if dict_entry:
-                    prioritized_words.append(word)
-        # Add high-frequency unknown words directly from the sorted dictionary
-        for entry in self.dictionary:
-            if entry['status'] == 0 and entry['word'] not in prioritized_words:
-                prioritized_words.append(entry['word'])
                 if len(prioritized_words) >= self.daily_target:
                     break
+                if word in self.dictionary and word not in self.review_scheduler and word not in selected:
+                    prioritized_words.append(word)
+        # Fill up with high-frequency unknown words from the dictionary's unknown index
+        remaining = self.daily_target - len(prioritized_words)
+        if remaining > 0:
+            prioritized_words.extend(self.word_status.top_unknown(remaining, exclude=set(prioritized_words)))
         return prioritized_words
 
     def is_dutch_word(self, word):
-        check_prompt = f"Is '{word}' a Dutch word? Respond with only 'Yes' or 'No'."
-        check_response = self.openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a Dutch language expert."},
-                {"role": "user", "content": check_prompt}
-            ]
+        if self.word_validator.is_valid(word):
+            return True
+        if not self.llm_word_check:
+            return False
+        cached = self.word_info_cache.get(word, self.model, IS_DUTCH_PROMPT_VERSION)
+        if cached is not None:
+            return cached == "yes"
+        return get_single_flight().do(self.flight_key(IS_DUTCH_PROMPT_VERSION, word), lambda: self.check_dutch_word(word))
+
+    def check_dutch_word(self, word):
+        # Checked again: an identical lookup may have finished since the caller missed the cache
+        cached = self.word_info_cache.get(word, self.model, IS_DUTCH_PROMPT_VERSION)
+        if cached is None:
+            cached = "yes" if self.complete(self.is_dutch_messages(word), 'is_dutch').strip().lower() == "yes" else "no"
+            self.word_info_cache.set(word, self.model, IS_DUTCH_PROMPT_VERSION, cached)
+        return cached == "yes"
+
+    async def ais_dutch_word(self, word):
+        if self.word_validator.is_valid(word):
+            return True
+        if not self.llm_word_check:
+            return False
+        cached = self.word_info_cache.get(word, self.model, IS_DUTCH_PROMPT_VERSION)
+        if cached is not None:
+            return cached == "yes"
+        return await get_single_flight().ado(
+            self.flight_key(IS_DUTCH_PROMPT_VERSION, word), lambda: self.acheck_dutch_word(word)
         )
-        return check_response.choices[0].message.content.strip().lower() == "yes"
+
+    async def acheck_dutch_word(self, word):
+        cached = self.word_info_cache.get(word, self.model, IS_DUTCH_PROMPT_VERSION)
+        if cached is None:
+            answer = await self.acomplete(self.is_dutch_messages(word), 'is_dutch')
+            cached = "yes" if answer.strip().lower() == "yes" else "no"
+            self.word_info_cache.set(word, self.model, IS_DUTCH_PROMPT_VERSION, cached)
+        return cached == "yes"
+
+    def flight_key(self, prompt_version, word):
+        # Lookups are identical when they would share a cache entry
+        return prompt_version, self.model, word
+
+    def unrecognized_word_message(self, word):
+        suggestions = self.word_validator.suggest(word)
+        if suggestions:
+            return f"'{word}' is not recognized as a Dutch word. Did you mean: {', '.join(suggestions)}?"
+        return f"'{word}' is not recognized as a Dutch word. Please check your spelling or try a different word."
+
+    def is_dutch_messages(self, word):
+        check_prompt = f"Is '{word}' a Dutch word? Respond with only 'Yes' or 'No'."
+        return [
+            {"role": "system", "content": "You are a Dutch language expert."},
+            {"role": "user", "content": check_prompt}
+        ]
+
+    def complete(self, messages, operation='word_info', **kwargs):
+        def create():
+            with metrics.openai_call(operation):
+                return self.openai_client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+        response = get_openai_limiter().call(create)
+        metrics.record_usage(operation, response)
+        return response.choices[0].message.content
+
+    def complete_stream(self, messages, operation='word_info_stream'):
+        limiter = get_openai_limiter()
+        attempt = 0
+        while True:
+            started = limiter.acquire()
+            error, ok, streamed = None, False, False
+            try:
+                with metrics.openai_call(operation):
+                    stream = self.openai_client.chat.completions.create(model=self.model, messages=messages, stream=True)
+                    for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            streamed = True
+                            yield chunk.choices[0].delta.content
+                ok = True
+                return
+            except Exception as e:
+                error = e
+                # A stream is only retried if it failed before anything was passed on
+                delay = None if streamed else limiter.retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                limiter.release(started, error, ok)
+            time.sleep(delay)
+            attempt += 1
+
+    async def acomplete(self, messages, operation='word_info'):
+        client = self.async_openai_client or get_async_openai_client()
+
+        async def create():
+            with metrics.openai_call(operation):
+                return await asyncio.wait_for(
+                    client.chat.completions.create(model=self.model, messages=messages),
+                    timeout=self.openai_timeout
+                )
+        response = await get_openai_limiter().acall(create)
+        metrics.record_usage(operation, response)
+        return response.choices[0].message.content
+
+    async def acomplete_stream(self, messages, operation='word_info_stream'):
+        client = self.async_openai_client or get_async_openai_client()
+        limiter = get_openai_limiter()
+        attempt = 0
+        while True:
+            started = await limiter.aacquire()
+            error, ok, streamed = None, False, False
+            try:
+                with metrics.openai_call(operation):
+                    stream = await asyncio.wait_for(
+                        client.chat.completions.create(model=self.model, messages=messages, stream=True),
+                        timeout=self.openai_timeout
+                    )
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            streamed = True
+                            yield chunk.choices[0].delta.content
+                ok = True
+                return
+            except Exception as e:
+                error = e
+                delay = None if streamed else limiter.retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                limiter.release(started, error, ok)
+            await asyncio.sleep(delay)
+            attempt += 1
 
     def get_word_info(self, word, is_searched=False):
         if is_searched:
+            word = self.word_validator.normalize(word) or word  # Share cache entries across capitalizations
             is_dutch = self.is_dutch_word(word)
             if not is_dutch:
-                return f"'{word}' is not recognized as a Dutch word. Please check your spelling or try a different word."
+                return self.unrecognized_word_message(word)
+
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is None:
+            word_info = get_single_flight().do(
+                self.flight_key(WORD_INFO_PROMPT_VERSION, word), lambda: self.lookup_word_info(word)
+            )
+
+        if is_searched and is_dutch:
+            self.update_search_history(word, False)
+        return word_info
+
+    async def aget_word_info(self, word, is_searched=False):
+        if is_searched:
+            word = self.word_validator.normalize(word) or word  # Share cache entries across capitalizations
+            is_dutch = await self.ais_dutch_word(word)
+            if not is_dutch:
+                return self.unrecognized_word_message(word)
+
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is None:
+            word_info = await get_single_flight().ado(
+                self.flight_key(WORD_INFO_PROMPT_VERSION, word), lambda: self.alookup_word_info(word)
+            )
 
+        if is_searched and is_dutch:
+            self.update_search_history(word, False)
+        return word_info
+
+    def get_word_info_stream(self, word, is_searched=False):
+        # Same as get_word_info, but yields the answer in pieces as the completion streams in
+        if is_searched:
+            word = self.word_validator.normalize(word) or word
+            if not self.is_dutch_word(word):
+                yield self.unrecognized_word_message(word)
+                return
+
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is not None:
+            yield word_info
+        else:
+            yield from self.stream_word_info(word)
+
+        if is_searched:
+            self.update_search_history(word, False)
+
+    async def aget_word_info_stream(self, word, is_searched=False):
+        if is_searched:
+            word = self.word_validator.normalize(word) or word
+            if not await self.ais_dutch_word(word):
+                yield self.unrecognized_word_message(word)
+                return
+
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is not None:
+            yield word_info
+        else:
+            async for part in self.astream_word_info(word):
+                yield part
+
+        if is_searched:
+            self.update_search_history(word, False)
+
+    def lookup_word_info(self, word):
+        # Checked again: an identical lookup may have finished since the caller missed the cache
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is None:
+            word_info = self.fetch_word_info(word)
+            self.word_info_cache.set(word, self.model, WORD_INFO_PROMPT_VERSION, word_info)
+        return word_info
+
+    async def alookup_word_info(self, word):
+        word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+        if word_info is None:
+            word_info = await self.acomplete(self.word_info_messages(word))
+            self.word_info_cache.set(word, self.model, WORD_INFO_PROMPT_VERSION, word_info)
+        return word_info
+
+    def stream_word_info(self, word):
+        # Streams the lookup, or waits for an identical lookup in flight and yields its answer whole
+        flights = get_single_flight()
+        key = self.flight_key(WORD_INFO_PROMPT_VERSION, word)
+        while True:
+            future, leader = flights.claim(key)
+            if leader:
+                break
+            wait([future])
+            if not future.cancelled():
+                yield future.result()
+                return
+        try:
+            word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+            if word_info is None:
+                parts = []
+                for part in self.complete_stream(self.word_info_messages(word)):
+                    parts.append(part)
+                    yield part
+                word_info = "".join(parts)
+                self.word_info_cache.set(word, self.model, WORD_INFO_PROMPT_VERSION, word_info)
+                flights.finish(key, future, word_info)
+                return
+        except BaseException as e:
+            flights.finish(key, future, error=e)
+            raise
+        flights.finish(key, future, word_info)
+        yield word_info
+
+    async def astream_word_info(self, word):
+        flights = get_single_flight()
+        key = self.flight_key(WORD_INFO_PROMPT_VERSION, word)
+        while True:
+            future, leader = flights.claim(key)
+            if leader:
+                break
+            shared = asyncio.wrap_future(future)
+            await asyncio.wait([shared])
+            if not shared.cancelled():
+                yield shared.result()
+                return
+        try:
+            word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+            if word_info is None:
+                parts = []
+                async for part in self.acomplete_stream(self.word_info_messages(word)):
+                    parts.append(part)
+                    yield part
+                word_info = "".join(parts)
+                self.word_info_cache.set(word, self.model, WORD_INFO_PROMPT_VERSION, word_info)
+                flights.finish(key, future, word_info)
+                return
+        except BaseException as e:
+            flights.finish(key, future, error=e)
+            raise
+        flights.finish(key, future, word_info)
+        yield word_info
+
+    def fetch_word_info(self, word):
+        return self.complete(self.word_info_messages(word))
+
+    def get_word_info_batch(self, words):
+        word_infos = {}
+        missing = []
+        for word in words:
+            word_info = self.word_info_cache.get(word, self.model, WORD_INFO_PROMPT_VERSION)
+            if word_info is None:
+                missing.append(word)
+            else:
+                word_infos[word] = word_info
+
+        # Words another lookup is already fetching are waited for rather than fetched again
+        flights = get_single_flight()
+        claimed = {}
+        in_flight = {}
+        for word in missing:
+            future, leader = flights.claim(self.flight_key(WORD_INFO_PROMPT_VERSION, word))
+            (claimed if leader else in_flight)[word] = future
+        try:
+            words = list(claimed)
+            for i in range(0, len(words), self.word_info_batch_size):
+                batch = words[i:i + self.word_info_batch_size]
+                parsed = self.fetch_word_info_batch(batch)
+                for word in batch:
+                    word_info = parsed.get(word)
+                    if word_info is None:
+                        # Retry words the batched answer left out or got wrong
+                        word_info = self.fetch_word_info(word)
+                    self.word_info_cache.set(word, self.model, WORD_INFO_PROMPT_VERSION, word_info)
+                    flights.finish(self.flight_key(WORD_INFO_PROMPT_VERSION, word), claimed[word], word_info)
+                    word_infos[word] = word_info
+        except BaseException as e:
+            for word, future in claimed.items():
+                flights.finish(self.flight_key(WORD_INFO_PROMPT_VERSION, word), future, error=e)
+            raise
+        for word, future in in_flight.items():
+            wait([future])
+            word_infos[word] = self.get_word_info(word) if future.cancelled() else future.result()
+        return word_infos
+
+    def fetch_word_info_batch(self, words):
+        if len(words) == 1:
+            return {words[0]: self.fetch_word_info(words[0])}
+        content = self.complete(
+            self.word_info_batch_messages(words), 'word_info_batch', response_format={"type": "json_object"}
+        )
+        return self.parse_word_info_batch(content, words)
+
+    def word_info_batch_messages(self, words):
+        prompt = f"""
+        Provide information for each of these Dutch words: {json.dumps(words, ensure_ascii=False)}
+        For every word give the translation in English, the translation in Chinese (with pinyin),
+        two example sentences in Dutch with English translations and a brief explanation of its usage.
+        Respond with a JSON object of the form:
+        {{"words": [{{"word": "...", "english": "...", "chinese": "... (pinyin)",
+          "examples": [{{"dutch": "...", "english": "..."}}, {{"dutch": "...", "english": "..."}}],
+          "usage": "..."}}]}}
+        """
+        return [
+            {"role": "system", "content": "You are a helpful assistant for learning Dutch. You answer in JSON."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def parse_word_info_batch(self, content, words):
+        try:
+            entries = json.loads(content)["words"]
+        except (ValueError, KeyError, TypeError):
+            return {}
+        requested = set(words)
+        parsed = {}
+        for entry in entries:
+            try:
+                word = entry["word"]
+                if word not in requested:
+                    continue
+                examples = "\n".join(
+                    f"{i}. {example['dutch']} ({example['english']})"
+                    for i, example in enumerate(entry["examples"], 1)
+                )
+                parsed[word] = (
+                    f"Word: {word}\n"
+                    f"English: {entry['english']}\n"
+                    f"Chinese: {entry['chinese']}\n"
+                    f"Examples:\n{examples}\n"
+                    f"Usage: {entry['usage']}"
+                )
+            except (KeyError, TypeError):
+                continue
+        return parsed
+
+    def word_info_messages(self, word):
         prompt = f"""
         Provide information for the Dutch word '{word}':
         1. Translation in English
@@ -200,47 +907,29 @@ class LanguageLearningManager:
         2. [Dutch sentence] ([English translation])
         Usage: [Brief explanation of usage]
         """
-        response = self.openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant for learning Dutch."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        word_info = response.choices[0].message.content
-
-        if is_searched and is_dutch:
-            self.update_search_history(word, False)
-        return word_info
+        return [
+            {"role": "system", "content": "You are a helpful assistant for learning Dutch."},
+            {"role": "user", "content": prompt}
+        ]
 
     def update_search_history(self, word, is_known):
-        if not self.search_history:
-            self.search_history = self.load_search_history()
-
         if is_known:
             # Remove the word if it's marked as known
-            if word in self.search_history:
-                self.search_history.remove(word)
+            self.search_history.remove(word)
         else:
             # Add or move the word to the beginning if it's unknown
-            if word in self.search_history:
-                self.search_history.remove(word)
-            self.search_history.insert(0, word)
-        
-        # Update the file with the new order
-        with open(self.search_history_file, mode='w', newline='', encoding='utf-8') as csv_file:
-            csv_writer = csv.writer(csv_file)
-            for w in self.search_history:
-                csv_writer.writerow([w])
+            self.search_history.add(word)
 
     def update_word_status(self, word, status):
-        for entry in self.dictionary:
-            if entry['word'] == word:
-                entry['status'] = 1 if status else 0
-                entry['last_updated'] = datetime.now()
-                break
-        
-        self.save_dictionary_to_csv()
+        status = 1 if status else 0
+        last_updated = datetime.now()
+        if self.word_status.set_status(word, status, last_updated):
+            self.dictionary_store.set_status(self.status_user_id, word, status, last_updated)
+
+    def update_review_schedule(self, word, is_known):
+        if word in self.dictionary:
+            schedule = self.review_scheduler.review(word, is_known)
+            self.dictionary_store.set_schedule(self.status_user_id, word, schedule)
 
     def format_word_info(self, word_info):
         if word_info:
@@ -248,21 +937,135 @@ class LanguageLearningManager:
         else:
             return "Word not found."
 
+    def get_cache_stats(self):
+        return self.word_info_cache.stats()
+
     def check_if_word_learned(self, response):
         # Implement your logic to determine if a word was learned
         return "new word" in response.lower()
     
     def mark_word(self, word, is_known):
+        self.apply_mark(word, is_known)
+        achieved_milestones = self.check_milestones()
+        return achieved_milestones
+
+    def mark_words(self, marks):
+        # Applies (word, is_known) marks as one store transaction and checks milestones once.
+        # Like a single mark, a mark must be for a quiz word served and not marked yet; the last mark of a word wins.
+        marks = list(dict(marks).items())
+        served = set(self.current_quiz_words[:self.current_quiz_index])
+        unserved = [word for word, _ in marks if word not in served]
+        if unserved:
+            raise ValueError(f"Not served in the current quiz: {', '.join(unserved[:20])}")
+        marked = [word for word, _ in marks if word not in self.unmarked_quiz_words]
+        if marked:
+            raise ValueError(f"Already marked: {', '.join(marked[:20])}")
+        with self.dictionary_store.batch():
+            for word, is_known in marks:
+                self.apply_mark(word, is_known)
+        self.awaiting_mark = False
+        return self.check_milestones()
+
+    def apply_mark(self, word, is_known):
+        self.unmarked_quiz_words.discard(word)
         self.update_word_status(word, is_known)
+        self.update_review_schedule(word, is_known)
         self.update_search_history(word, is_known)
         if is_known:
             self.total_words_learned += 1
-            self.save_data_to_json()
-        elif not is_known:
+            increment_words_learned(self.status_user_id)
+        else:
             self.unknown_word_count += 1
-        
-        achieved_milestones = self.check_milestones()
-        return achieved_milestones
+            if self.unknown_word_count >= 10:
+                self.cancel_prefetch()
+
+    def parse_message(self, message):
+        text = message.strip()
+        if text.lower() == "daily quiz":
+            return "quiz", None
+        if text.lower() in ("known", "unknown") and self.awaiting_mark:
+            return "mark", text.lower() == "known"
+        if text.endswith('?'):
+            return "search", text[:-1].strip()
+        return "help", None
+
+    def mark_current_quiz_word(self, is_known):
+        current_word = self.current_quiz_words[self.current_quiz_index - 1]
+        self.awaiting_mark = False
+        achieved_milestones = self.mark_word(current_word, is_known)
+        status_message = "known" if is_known else "unknown"
+        return [f"Word '{current_word}' marked as {status_message}."] + achieved_milestones
+
+    def format_quiz_reply(self, word_info, notes=(), first=False):
+        lines = list(notes)
+        if word_info:
+            lines.append("Here's your first word:" if first else "Here's the next word:")
+            lines.append(word_info)
+        elif first:
+            lines.append("No more words in the quiz.")
+        else:
+            lines.append("Quiz completed. Type 'daily quiz' to start a new one.")
+        return "\n\n".join(lines)
+
+    def format_search_reply(self, word, word_info):
+        if "not recognized as a Dutch word" in word_info:
+            return word_info
+        return f"Here's the information for '{word}':\n\n{word_info}"
+
+    def process_message(self, message):
+        kind, argument = self.parse_message(message)
+        if kind == "quiz":
+            return self.format_quiz_reply(self.daily_word_quiz(), first=True)
+        if kind == "mark":
+            notes = self.mark_current_quiz_word(argument)
+            return self.format_quiz_reply(self.get_next_quiz_word(), notes)
+        if kind == "search":
+            return self.format_search_reply(argument, self.get_word_info(argument, is_searched=True))
+        return HELP_MESSAGE
+
+    async def aprocess_message(self, message):
+        kind, argument = self.parse_message(message)
+        if kind == "quiz":
+            return self.format_quiz_reply(await self.adaily_word_quiz(), first=True)
+        if kind == "mark":
+            notes = self.mark_current_quiz_word(argument)
+            return self.format_quiz_reply(await self.aget_next_quiz_word(), notes)
+        if kind == "search":
+            return self.format_search_reply(argument, await self.aget_word_info(argument, is_searched=True))
+        return HELP_MESSAGE
+
+    def quiz_reply_header(self, notes=(), first=False):
+        # The part of format_quiz_reply that precedes the word info, or the whole reply if the quiz is over
+        lines = list(notes)
+        if self.peek_next_quiz_word() is not None:
+            lines.append("Here's your first word:" if first else "Here's the next word:")
+            return "\n\n".join(lines) + "\n\n", True
+        self.cancel_prefetch()
+        return self.format_quiz_reply(None, notes, first), False
+
+    async def aprocess_message_stream(self, message):
+        # Yields the same reply as aprocess_message, in pieces, streaming the word info as it is generated
+        kind, argument = self.parse_message(message)
+        if kind in ("quiz", "mark"):
+            if kind == "quiz":
+                self.start_quiz()
+                header, has_word = self.quiz_reply_header(first=True)
+            else:
+                header, has_word = self.quiz_reply_header(self.mark_current_quiz_word(argument))
+            yield header
+            if has_word:
+                async for part in self.aget_next_quiz_word_stream():
+                    yield part
+        elif kind == "search":
+            word = self.word_validator.normalize(argument) or argument
+            if not await self.ais_dutch_word(word):
+                yield self.unrecognized_word_message(word)
+                return
+            yield f"Here's the information for '{argument}':\n\n"
+            async for part in self.aget_word_info_stream(word, is_searched=True):
+                yield part
+        else:
+            yield HELP_MESSAGE
 
     def check_milestones(self):
         achieved_milestones = []
@@ -271,6 +1074,13 @@ class LanguageLearningManager:
                 achieved_milestones.append(f"Congratulations! You've learned {milestone['milestone']} words. You've earned: {milestone['reward']}")
         return achieved_milestones
 
+    def close(self):
+        self.cancel_prefetch()
+        if not self.closed:
+            # Release the search history once, as it is shared by this user's managers
+            self.closed = True
+            release_search_history(self.status_user_id)
+
     def __del__(self):
         pass
 
@@ -0,0 +1,196 @@
+import os
+import threading
+from bisect import bisect_left
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# Off by default; when off, decorators return the function unchanged and timers are no-ops
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+_DISABLED = nullcontext()
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (non-cumulative, last one is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)  # First bucket with value <= bound
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", le)])} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}')
+                lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge whose values are read from ``collect()`` (labels -> value) at scrape time."""
+
+    def __init__(self, name, documentation, metric_type, labelnames, collect):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels, errors=None):
+        self.histogram = histogram
+        self.labels = labels
+        self.errors = errors
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(*self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+openai_request_seconds = registry.register(Histogram(
+    'chat2dutch_openai_request_seconds', 'Duration of OpenAI chat completion calls.', ['operation']
+))
+openai_errors = registry.register(Counter(
+    'chat2dutch_openai_errors_total', 'OpenAI chat completion calls that raised.', ['operation']
+))
+openai_tokens = registry.register(Counter(
+    'chat2dutch_openai_tokens_total', 'Tokens reported by OpenAI chat completion calls.', ['operation', 'kind']
+))
+io_seconds = registry.register(Histogram(
+    'chat2dutch_io_seconds', 'Duration of file and database loads and saves.', ['store', 'operation']
+))
+http_request_seconds = registry.register(Histogram(
+    'chat2dutch_http_request_seconds', 'Duration of HTTP requests until the response starts.',
+    ['method', 'endpoint', 'status']
+))
+
+
+def timer(histogram, *labels):
+    return _Timer(histogram, labels) if METRICS_ENABLED else _DISABLED
+
+
+def openai_call(operation):
+    # Times one completion call and counts it as an error if it raises
+    return _Timer(openai_request_seconds, (operation,), openai_errors) if METRICS_ENABLED else _DISABLED
+
+
+def timed(histogram, *labels):
+    """Decorator timing every call of the function; a no-op when metrics are disabled."""
+    def decorate(function):
+        if not METRICS_ENABLED:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with _Timer(histogram, labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_usage(operation, response):
+    if not METRICS_ENABLED:
+        return
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        openai_tokens.inc(operation, 'prompt', amount=usage.prompt_tokens or 0)
+        openai_tokens.inc(operation, 'completion', amount=usage.completion_tokens or 0)
+
+
+def register_callback(name, documentation, metric_type, labelnames, collect):
+    if METRICS_ENABLED:
+        registry.register(CallbackMetric(name, documentation, metric_type, labelnames, collect))
+
+
+def render():
+    return registry.render()
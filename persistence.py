@@ -0,0 +1,106 @@
+import atexit
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path, write, newline=None, binary=False):
+    """Write a file through ``write(file)`` into a temporary file and rename it over ``path``.
+
+    Readers and crashes only ever see the old or the new content, never a partial file.
+    The file is opened in text mode (UTF-8) unless ``binary`` is set.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        temp_file = os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8', newline=newline)
+        with temp_file:
+            write(temp_file)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class WriteBehind:
+    """Collects dirty state and flushes it off the request path.
+
+    Callers register a flush callback under a key with ``mark_dirty``; repeated marks of
+    the same key are coalesced into one call. A background thread runs the callbacks every
+    ``flush_interval`` seconds, or earlier once ``max_dirty`` changes have accumulated.
+    ``close`` (also run at interpreter exit) flushes whatever is left.
+    """
+
+    def __init__(self, flush_interval=2.0, max_dirty=100):
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._dirty = {}
+        self._changes = 0
+        self._closed = False
+        self._flush_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def mark_dirty(self, key, flush):
+        if self._closed:
+            flush()
+            return
+        with self._condition:
+            self._dirty[key] = flush
+            self._changes += 1
+            if self._changes >= self.max_dirty:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or self._changes >= self.max_dirty, timeout=self.flush_interval
+                )
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._condition:
+                dirty, self._dirty = self._dirty, {}
+                self._changes = 0
+            for key, flush in dirty.items():
+                try:
+                    flush()
+                except Exception:
+                    logger.exception(f"Write-behind flush failed for {key!r}")
+                    with self._condition:
+                        self._dirty.setdefault(key, flush)
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+
+_write_behind = None
+_write_behind_lock = threading.Lock()
+
+def get_write_behind():
+    global _write_behind
+    with _write_behind_lock:
+        if _write_behind is None:
+            _write_behind = WriteBehind(
+                flush_interval=float(os.getenv('WRITE_BEHIND_INTERVAL', '2')),
+                max_dirty=int(os.getenv('WRITE_BEHIND_MAX_DIRTY', '100')),
+            )
+        return _write_behind
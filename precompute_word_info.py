@@ -0,0 +1,26 @@
+import argparse
+from itertools import islice
+from dotenv import load_dotenv
+from language_learning_manager import LanguageLearningManager
+
+# Warm the word info cache for the most frequent dictionary words using batched requests,
+# so that quizzes and searches for these words never wait on the LLM.
+def precompute_word_info(manager, limit, chunk_size=100):
+    # The dictionary iterates in descending frequency order
+    words = [entry['word'] for entry in islice(manager.dictionary, limit)]
+    for start in range(0, len(words), chunk_size):
+        manager.get_word_info_batch(words[start:start + chunk_size])
+        print(f"{min(start + chunk_size, len(words))}/{len(words)} words enriched")
+    print(f"Cache stats: {manager.get_cache_stats()}")
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Precompute word information for the most frequent words.")
+    parser.add_argument("--limit", type=int, default=5000, help="Number of most frequent words to enrich")
+    parser.add_argument("--batch-size", type=int, default=None, help="Words per LLM request")
+    args = parser.parse_args()
+
+    manager = LanguageLearningManager()
+    if args.batch_size:
+        manager.word_info_batch_size = args.batch_size
+    precompute_word_info(manager, args.limit)
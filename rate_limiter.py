@@ -0,0 +1,237 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+def status_code(error):
+    return getattr(error, 'status_code', None)
+
+
+def retry_after(error):
+    """Seconds from the Retry-After (or retry-after-ms) header of a failed API call, or None."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    status = status_code(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(error, TimeoutError):
+        return True
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(error, openai.APIConnectionError)
+
+
+class AdaptiveLimiter:
+    """Limits the calls to a rate-limited API made by one process.
+
+    Calls are admitted while fewer than ``limit`` are in flight and, when ``rate`` is
+    set, a token bucket of ``burst`` tokens refilled at ``rate`` per second has a token
+    left. Failed calls are retried up to ``max_retries`` times after a jittered
+    exponential backoff, or after their Retry-After plus jitter.
+
+    An occasional rate-limited call is only retried. Once more than ``backoff_share`` of
+    the recent calls are rate limited, the limit is being hit: the concurrency limit
+    adapts (AIMD), halving on a rate-limited call, at most once per round of calls in
+    flight, and growing by ``1 / limit`` per successful call, up to ``max_concurrency``;
+    and a Retry-After holds back every call until it has passed.
+
+    Works from threads and asyncio tasks alike: ``call`` and ``acall`` run a call with
+    retries; ``acquire``/``aacquire`` and ``release`` hold a slot around calls that
+    cannot simply be retried, such as streams.
+    """
+
+    def __init__(self, max_concurrency, rate=0.0, burst=None, max_retries=3, base_backoff=0.5, max_backoff=20.0,
+                 min_concurrency=1, backoff_share=0.25):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.limit = float(max_concurrency)
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.backoff_share = backoff_share
+        # Moving average over roughly the last 20 calls
+        self.rate_limited_share = 0.0
+        self.in_flight = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._decreased_at = 0.0
+        self._waiters = deque()  # Wake-up callbacks of callers waiting for a free slot
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, now):
+        # 0 when a slot was taken, else the seconds to wait, or None to wait for a slot to be released
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def _wake(self):
+        # Called with the lock held; wakes as many waiters as there are free slots
+        for _ in range(min(len(self._waiters), int(self.limit) - self.in_flight)):
+            self._waiters.popleft()()
+
+    def _wake_task(self, future):
+        if future.cancelled():
+            with self._lock:
+                self._wake()  # Pass the wake-up on to the next waiter
+        elif not future.done():
+            future.set_result(None)
+
+    def acquire(self):
+        """Blocks until a call may start; returns the start time to pass to ``release``."""
+        while True:
+            event = None
+            with self._lock:
+                now = time.monotonic()
+                delay = self._try_acquire(now)
+                if delay == 0:
+                    return now
+                if delay is None:
+                    event = threading.Event()
+                    self._waiters.append(event.set)
+            if event is None:
+                time.sleep(delay)
+            else:
+                event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            future = None
+            with self._lock:
+                now = time.monotonic()
+                delay = self._try_acquire(now)
+                if delay == 0:
+                    return now
+                if delay is None:
+                    future = loop.create_future()
+                    self._waiters.append(lambda: loop.call_soon_threadsafe(self._wake_task, future))
+            if future is None:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    with self._lock:
+                        self._wake()
+                raise
+
+    def release(self, started, error=None, ok=True):
+        """Frees the slot of a call that started at ``started``; ``ok=False`` without an error leaves the limit as is."""
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            rate_limited = error is not None and status_code(error) == 429
+            if error is not None or ok:
+                self.rate_limited_share += 0.05 * (rate_limited - self.rate_limited_share)
+            if rate_limited:
+                self.rate_limited += 1
+                if self.rate_limited_share > self.backoff_share:
+                    # Calls started before the last decrease were admitted under the old limit
+                    if started >= self._decreased_at:
+                        self.limit = max(self.min_concurrency, self.limit / 2)
+                        self._decreased_at = now
+                    pause = retry_after(error)
+                    if pause:
+                        self._blocked_until = max(self._blocked_until, now + pause)
+            elif error is None and ok:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._wake()
+
+    def retry_delay(self, attempt, error):
+        """Seconds to wait before retrying a call that failed with ``error``, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        with self._lock:
+            self.retries += 1
+        # Full jitter, so callers failing together do not retry together
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        pause = retry_after(error)
+        return delay if pause is None else pause + delay
+
+    def call(self, function):
+        attempt = 0
+        while True:
+            started = self.acquire()
+            error, ok = None, False
+            try:
+                result = function()
+                ok = True
+                return result
+            except Exception as e:
+                error = e
+                delay = self.retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.release(started, error, ok)
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, function):
+        attempt = 0
+        while True:
+            started = await self.aacquire()
+            error, ok = None, False
+            try:
+                result = await function()
+                ok = True
+                return result
+            except Exception as e:
+                error = e
+                delay = self.retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            finally:
+                self.release(started, error, ok)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'rate_limited': self.rate_limited,
+                'retries': self.retries,
+            }
@@ -0,0 +1,50 @@
+import json
+import os
+import threading
+import time
+
+
+class RequestCapture:
+    """Appends incoming chat messages to a JSONL file for later replay.
+
+    ``record`` only appends to an in-memory buffer, so the request path never waits for
+    the disk; with a ``write_behind`` the buffered lines are written in one append per
+    flush. Each line is ``{"ts": epoch seconds, "user_id": ..., "endpoint": ..., "message": ...}``.
+    A flush is a single ``write`` on an ``O_APPEND`` descriptor, so several worker processes
+    can capture into the same file without interleaving lines.
+    """
+
+    def __init__(self, path, write_behind=None):
+        self.path = path
+        self.write_behind = write_behind
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def record(self, user_id, message, endpoint='/chatbot'):
+        with self._lock:
+            self._buffer.append((time.time(), user_id, endpoint, message))
+        if self.write_behind is None:
+            self.flush()
+        else:
+            self.write_behind.mark_dirty(self.path, self.flush)
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                buffer, self._buffer = self._buffer, []
+            if not buffer or self._fd is None:
+                return
+            os.write(self._fd, ''.join(
+                json.dumps({'ts': ts, 'user_id': user_id, 'endpoint': endpoint, 'message': message},
+                           ensure_ascii=False) + '\n'
+                for ts, user_id, endpoint, message in buffer
+            ).encode('utf-8'))
+
+    def close(self):
+        self.flush()
+        with self._write_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
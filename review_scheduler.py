@@ -0,0 +1,99 @@
+import heapq
+import time
+
+DAY_SECONDS = 24 * 60 * 60
+
+# SM-2 answer qualities for the two answers a quiz gives
+KNOWN_QUALITY = 4
+UNKNOWN_QUALITY = 2
+
+INITIAL_EASE = 2.5
+MINIMUM_EASE = 1.3
+
+
+class ReviewScheduler:
+    """Per-user SM-2 spaced repetition schedule kept as a min-heap on due time.
+
+    ``schedules`` maps each reviewed word to (repetitions, interval in days, ease,
+    due epoch seconds). The heap holds (due, word) entries; rescheduling a word pushes a
+    new entry and leaves the old one behind, which is dropped when it reaches the top
+    because its due time no longer matches the word's schedule. A review is therefore
+    O(log n) and collecting the due words only touches the words returned.
+    """
+
+    def __init__(self):
+        self.schedules = {}
+        self.heap = []
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: (word, repetitions, interval_days, ease, due)
+        scheduler = cls()
+        for word, repetitions, interval, ease, due in rows:
+            scheduler.schedules[word] = (repetitions, interval, ease, due)
+        scheduler.heap = [(schedule[3], word) for word, schedule in scheduler.schedules.items()]
+        heapq.heapify(scheduler.heap)
+        return scheduler
+
+    def __len__(self):
+        return len(self.schedules)
+
+    def __contains__(self, word):
+        return word in self.schedules
+
+    def _push(self, word, schedule):
+        self.schedules[word] = schedule
+        heapq.heappush(self.heap, (schedule[3], word))
+        if len(self.heap) > 2 * len(self.schedules) + 64:
+            # Too many stale entries; rebuild from the live schedules
+            self.heap = [(schedule[3], word) for word, schedule in self.schedules.items()]
+            heapq.heapify(self.heap)
+
+    def seed(self, word, status, reviewed_at):
+        # Schedule a word marked before the scheduler existed as if it had been reviewed once
+        if word not in self.schedules:
+            self.review(word, status != 0, reviewed_at)
+
+    def review(self, word, is_known, now=None):
+        now = time.time() if now is None else now
+        repetitions, interval, ease, _ = self.schedules.get(word, (0, 0.0, INITIAL_EASE, now))
+        quality = KNOWN_QUALITY if is_known else UNKNOWN_QUALITY
+        ease = max(MINIMUM_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if is_known:
+            repetitions += 1
+            if repetitions == 1:
+                interval = 1.0
+            elif repetitions == 2:
+                interval = 6.0
+            else:
+                interval = round(interval * ease, 2)
+        else:
+            # Forgotten words start over and are due again right away
+            repetitions = 0
+            interval = 0.0
+        schedule = (repetitions, interval, ease, now + interval * DAY_SECONDS)
+        self._push(word, schedule)
+        return schedule
+
+    def due(self, count, now=None, exclude=()):
+        """Return up to ``count`` words due at ``now``, earliest first. The words stay
+        scheduled until they are reviewed again.
+        """
+        now = time.time() if now is None else now
+        heap = self.heap
+        taken = []
+        words = []
+        seen = set(exclude)
+        while heap and len(words) < count and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            due, word = entry
+            schedule = self.schedules.get(word)
+            if schedule is None or schedule[3] != due:
+                continue  # Stale entry of a rescheduled word
+            taken.append(entry)
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return words
@@ -0,0 +1,127 @@
+import csv
+import os
+import threading
+from collections import OrderedDict
+from persistence import atomic_write
+
+
+class SearchHistory:
+    """Most-recent-first search history with O(1) move-to-front and removal.
+
+    The history is persisted as a snapshot CSV (one word per row, newest first) plus an
+    append-only journal of changes. Each change appends one line to the journal; the
+    journal is folded into the snapshot once it grows past ``compact_after`` entries.
+    Journal lines are buffered and appended on flush, which with a ``write_behind`` is
+    its next flush, so no file is kept open between writes.
+    The oldest words are dropped once the history holds more than ``max_size`` words.
+    """
+
+    def __init__(self, file_path='search_history.csv', max_size=5000, compact_after=1000, write_behind=None):
+        self.file_path = file_path
+        self.write_behind = write_behind
+        self.journal_path = file_path + '.journal'
+        self.max_size = max_size
+        self.compact_after = compact_after
+        # Oldest first, so the newest word is at the end and move_to_end is the move-to-front
+        self._words = OrderedDict()
+        self._lock = threading.Lock()
+        self._journal_entries = 0
+        self._unwritten = []
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.file_path):
+            with open(self.file_path, mode='r', encoding='utf-8') as csv_file:
+                for row in reversed(list(csv.reader(csv_file))):
+                    if row:
+                        self._words[row[0]] = None
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, mode='r', encoding='utf-8') as journal:
+                for line in journal:
+                    line = line.rstrip('\n')
+                    if not line:
+                        continue
+                    # Replaying is idempotent, so a journal left over from an interrupted compaction is harmless
+                    if line[0] == '+':
+                        self._add(line[1:])
+                    elif line[0] == '-':
+                        self._words.pop(line[1:], None)
+                    self._journal_entries += 1
+        self._trim()
+
+    def _add(self, word):
+        self._words[word] = None
+        self._words.move_to_end(word)
+
+    def _trim(self):
+        while len(self._words) > self.max_size:
+            self._words.popitem(last=False)
+
+    def _log(self, operation, word):
+        self._unwritten.append(f"{operation}{word}\n")
+        self._journal_entries += 1
+
+    def _mark_dirty(self):
+        # Called without the lock held: a closed write-behind flushes inline, which takes the lock
+        if self.write_behind is None:
+            self.flush()
+        else:
+            self.write_behind.mark_dirty(self.journal_path, self.flush)
+
+    def _flush(self):
+        if self._unwritten:
+            with open(self.journal_path, mode='a', encoding='utf-8') as journal:
+                journal.writelines(self._unwritten)
+            self._unwritten = []
+        if self._journal_entries >= self.compact_after:
+            self._compact()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def add(self, word):
+        with self._lock:
+            self._add(word)
+            self._trim()
+            self._log('+', word)
+        self._mark_dirty()
+
+    def remove(self, word):
+        with self._lock:
+            if word not in self._words:
+                return
+            del self._words[word]
+            self._log('-', word)
+        self._mark_dirty()
+
+    def _compact(self):
+        def write(csv_file):
+            csv_writer = csv.writer(csv_file)
+            for word in reversed(self._words):
+                csv_writer.writerow([word])
+
+        atomic_write(self.file_path, write, newline='')
+        # The snapshot holds every change, written or not
+        open(self.journal_path, mode='w', encoding='utf-8').close()
+        self._unwritten = []
+        self._journal_entries = 0
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            self._compact()
+
+    def __iter__(self):
+        # Newest first; iterate over a copy so callers can mutate the history meanwhile
+        with self._lock:
+            return iter(list(reversed(self._words)))
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def __len__(self):
+        return len(self._words)
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class SessionPool:
+    """Bounded LRU pool of per-user session objects.
+
+    Sessions are created on first use with ``factory(user_id)`` and kept between
+    requests, so per-user state such as the current quiz survives across calls.
+    The least recently used session is evicted when the pool is full, and sessions
+    idle for longer than ``idle_timeout`` seconds are dropped. Sessions held through
+    ``use`` are never evicted, so a request never loses its session midway and a user
+    never has two; the pool may exceed ``max_sessions`` while they are in use.
+    """
+
+    def __init__(self, factory, max_sessions=1000, idle_timeout=1800):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        self._in_use = {}  # Number of requests holding each user's session
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            session, evicted = self._get(user_id)
+        self._close_all(evicted)
+        return session
+
+    @contextmanager
+    def use(self, user_id):
+        """Holds the user's session for the duration of a request."""
+        with self._lock:
+            session, evicted = self._get(user_id)
+            self._in_use[user_id] = self._in_use.get(user_id, 0) + 1
+        self._close_all(evicted)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._in_use[user_id] -= 1
+                if not self._in_use[user_id]:
+                    del self._in_use[user_id]
+                if user_id in self._sessions:
+                    # Idle time counts from the end of the last request
+                    self._sessions[user_id] = (session, time.monotonic())
+                    self._sessions.move_to_end(user_id)
+
+    def _get(self, user_id):
+        now = time.monotonic()
+        evicted = self._evict_idle(now)
+        if user_id in self._sessions:
+            session, _ = self._sessions.pop(user_id)
+        else:
+            session = self.factory(user_id)
+        self._sessions[user_id] = (session, now)
+        if len(self._sessions) > self.max_sessions:
+            # Least recently used first, skipping the sessions still in use
+            for old_user_id in list(self._sessions):
+                if len(self._sessions) <= self.max_sessions:
+                    break
+                if old_user_id != user_id and old_user_id not in self._in_use:
+                    evicted.append(self._sessions.pop(old_user_id)[0])
+        return session, evicted
+
+    def _evict_idle(self, now):
+        evicted = []
+        # Sessions are ordered by last use, so idle ones are at the front
+        for user_id, (session, last_used) in list(self._sessions.items()):
+            if now - last_used <= self.idle_timeout:
+                break
+            if user_id not in self._in_use:
+                del self._sessions[user_id]
+                evicted.append(session)
+        return evicted
+
+    def _close_all(self, sessions):
+        for session in sessions:
+            self._close(session)
+
+    def _close(self, session):
+        close = getattr(session, 'close', None)
+        if close is not None:
+            close()
+
+    def clear(self):
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            self._sessions.clear()
+        self._close_all(sessions)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, user_id):
+        return user_id in self._sessions
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import Future, wait
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one execution.
+
+    The first caller for a key becomes the leader and runs the call; callers arriving
+    while it is in flight wait for its result (or its exception) instead of running
+    their own. Results are not kept once the call finishes; that is the cache's job.
+    If the leader is cancelled, one of the waiting callers takes over.
+
+    Threads and asyncio tasks share the same registry, so a quiz prefetch thread and a
+    ``/chatbot`` request asking for the same word make a single call. A thread must not
+    wait on the event loop thread, as that would block the leader it is waiting for.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def claim(self, key):
+        """Returns ``(future, is_leader)``; a leader must pass the future to ``finish``."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            future.cancel()  # Cancelled or closed: the waiting callers retry on their own
+
+    def do(self, key, function):
+        while True:
+            future, leader = self.claim(key)
+            if leader:
+                break
+            wait([future])
+            if not future.cancelled():
+                return future.result()
+        try:
+            result = function()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    async def ado(self, key, function):
+        while True:
+            future, leader = self.claim(key)
+            if leader:
+                break
+            # Unlike awaiting the future, wait() does not raise when the leader is cancelled
+            shared = asyncio.wrap_future(future)
+            await asyncio.wait([shared])
+            if not shared.cancelled():
+                return shared.result()
+        try:
+            result = await function()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
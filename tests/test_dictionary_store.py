@@ -0,0 +1,60 @@
+import sqlite3
+from datetime import datetime
+
+from dictionary_store import DEFAULT_USER_ID, DictionaryStore
+
+
+def create_global_status_store(db_path):
+    # The schema of stores created before word status was kept per user
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+    CREATE TABLE words
+    (word TEXT PRIMARY KEY, frequency INTEGER NOT NULL, status INTEGER NOT NULL DEFAULT 0,
+     last_updated TEXT NOT NULL)
+    ''')
+    conn.execute('CREATE INDEX idx_words_status_frequency ON words (status, frequency DESC)')
+    conn.executemany('INSERT INTO words VALUES (?, ?, ?, ?)', [
+        ('huis', 30, 1, '2024-05-01 10:00:00'),
+        ('kat', 20, 0, '2024-05-01 10:00:00'),
+        ('hond', 10, 2, '2024-05-02 11:00:00'),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def test_global_status_is_migrated_to_the_default_user(tmp_path):
+    db_path = str(tmp_path / 'dictionary_store.db')
+    create_global_status_store(db_path)
+
+    store = DictionaryStore(db_path)
+    try:
+        assert list(store.load_rows()) == [('huis', 30), ('kat', 20), ('hond', 10)]
+        assert sorted(store.load_user_status(DEFAULT_USER_ID)) == [
+            ('hond', 2, '2024-05-02 11:00:00'),
+            ('huis', 1, '2024-05-01 10:00:00'),
+        ]
+        assert store.load_user_status(1) == []
+    finally:
+        store.close()
+
+    conn = sqlite3.connect(db_path)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(words)')]
+    indexes = [row[1] for row in conn.execute('PRAGMA index_list(words)')]
+    conn.close()
+    assert columns == ['word', 'frequency']
+    assert 'idx_words_status_frequency' not in indexes
+
+
+def test_migrated_store_opens_again_without_changes(tmp_path):
+    db_path = str(tmp_path / 'dictionary_store.db')
+    create_global_status_store(db_path)
+    DictionaryStore(db_path).close()
+
+    store = DictionaryStore(db_path)
+    try:
+        store.set_status(1, 'kat', 1, datetime(2024, 6, 1, 9))
+        store.flush()
+        assert len(store.load_user_status(DEFAULT_USER_ID)) == 2
+        assert store.load_user_status(1) == [('kat', 1, '2024-06-01 09:00:00')]
+    finally:
+        store.close()
@@ -0,0 +1,21 @@
+import language_learning_manager
+from language_learning_manager import get_search_history, release_search_history
+
+
+def test_search_history_is_closed_when_its_last_holder_releases_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(language_learning_manager, 'SEARCH_HISTORY_FILE', str(tmp_path / 'search_history.csv'))
+    history = get_search_history(5)
+    assert get_search_history(5) is history
+    history.add('huis')
+
+    release_search_history(5)
+    # Still held by the other manager, so a new one shares it rather than loading the files again
+    assert get_search_history(5) is history
+    release_search_history(5)
+    assert not (tmp_path / 'search_history_5.csv').exists()
+
+    release_search_history(5)
+    assert (tmp_path / 'search_history_5.csv').read_text() == 'huis\n'
+    reloaded = get_search_history(5)
+    assert reloaded is not history and list(reloaded) == ['huis']
+    release_search_history(5)
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limiter import AdaptiveLimiter, retry_after
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def run_call(limiter, error=None):
+    limiter.release(limiter.acquire(), error, ok=error is None)
+
+
+def acquire_times_out(limiter):
+    async def main():
+        try:
+            started = await asyncio.wait_for(limiter.aacquire(), 0.05)
+        except asyncio.TimeoutError:
+            return True
+        limiter.release(started, ok=False)
+        return False
+
+    return asyncio.run(main())
+
+
+def test_occasional_rate_limit_leaves_the_limit_alone():
+    limiter = AdaptiveLimiter(8)
+    run_call(limiter, APIError(429, {'retry-after': '30'}))
+
+    assert limiter.stats()['limit'] == 8
+    assert limiter.stats()['rate_limited'] == 1
+    assert not acquire_times_out(limiter)
+
+
+def test_sustained_rate_limits_halve_the_limit():
+    limiter = AdaptiveLimiter(8)
+    # The rate-limited share passes backoff_share on the sixth rate-limited call
+    limits = []
+    for _ in range(8):
+        run_call(limiter, APIError(429))
+        limits.append(limiter.stats()['limit'])
+
+    assert limits == [8, 8, 8, 8, 8, 4, 2, 1]
+
+
+def test_calls_started_before_a_decrease_do_not_halve_again():
+    limiter = AdaptiveLimiter(8)
+    for _ in range(5):
+        run_call(limiter, APIError(429))
+    first, second = limiter.acquire(), limiter.acquire()
+    limiter.release(first, APIError(429))
+    limiter.release(second, APIError(429))
+
+    assert limiter.stats()['limit'] == 4
+
+
+def test_retry_after_holds_back_calls_once_rate_limited():
+    limiter = AdaptiveLimiter(8)
+    for _ in range(5):
+        run_call(limiter, APIError(429))
+    run_call(limiter, APIError(429, {'retry-after': '30'}))
+
+    assert acquire_times_out(limiter)
+
+
+def test_successes_grow_the_limit_back():
+    limiter = AdaptiveLimiter(8)
+    for _ in range(8):
+        run_call(limiter, APIError(429))
+    assert limiter.stats()['limit'] == 1
+
+    run_call(limiter)
+    assert limiter.stats()['limit'] == 2
+    for _ in range(100):
+        run_call(limiter)
+    assert limiter.stats()['limit'] == 8
+
+
+def test_retry_delay():
+    limiter = AdaptiveLimiter(8, max_retries=2, base_backoff=0.5)
+
+    assert 2 <= limiter.retry_delay(0, APIError(429, {'retry-after': '2'})) <= 2.5
+    assert 0 <= limiter.retry_delay(1, APIError(503)) <= 1
+    assert limiter.retry_delay(2, APIError(503)) is None
+    assert limiter.retry_delay(0, APIError(400)) is None
+
+
+def test_retry_after_headers():
+    assert retry_after(APIError(429, {'retry-after-ms': '1500'})) == 1.5
+    assert retry_after(APIError(429, {'retry-after': '3'})) == 3
+    assert retry_after(APIError(429)) is None
+    future = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 60))
+    assert 55 < retry_after(APIError(429, {'retry-after': future})) <= 60
+
+
+def test_acall_retries_failed_calls():
+    limiter = AdaptiveLimiter(2, base_backoff=0)
+    failures = [APIError(503)]
+
+    async def lookup():
+        if failures:
+            raise failures.pop()
+        return 'huis'
+
+    assert asyncio.run(limiter.acall(lookup)) == 'huis'
+    assert limiter.stats() == {'limit': 2, 'in_flight': 0, 'rate_limited': 0, 'retries': 1}
+
+
+def test_call_gives_up_on_errors_that_cannot_be_retried():
+    limiter = AdaptiveLimiter(2, base_backoff=0)
+
+    def lookup():
+        raise APIError(400)
+
+    with pytest.raises(APIError):
+        limiter.call(lookup)
+    assert limiter.stats()['in_flight'] == 0
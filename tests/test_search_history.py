@@ -0,0 +1,91 @@
+from persistence import WriteBehind
+from search_history import SearchHistory
+
+
+def open_history(tmp_path, **kwargs):
+    return SearchHistory(str(tmp_path / 'search_history.csv'), **kwargs)
+
+
+def test_journal_is_replayed_on_load(tmp_path):
+    history = open_history(tmp_path)
+    for word in ['huis', 'kat', 'hond']:
+        history.add(word)
+    history.add('huis')
+    history.remove('kat')
+
+    # Nothing compacted yet: the snapshot does not exist and the journal holds every change
+    assert not (tmp_path / 'search_history.csv').exists()
+    assert (tmp_path / 'search_history.csv.journal').read_text() == '+huis\n+kat\n+hond\n+huis\n-kat\n'
+    assert list(open_history(tmp_path)) == ['huis', 'hond']
+
+
+def test_journal_is_replayed_on_top_of_the_snapshot(tmp_path):
+    history = open_history(tmp_path)
+    for word in ['huis', 'kat', 'hond']:
+        history.add(word)
+    history.compact()
+    history.add('boom')
+    history.add('huis')
+    history.remove('kat')
+
+    assert (tmp_path / 'search_history.csv').read_text() == 'hond\nkat\nhuis\n'
+    assert list(open_history(tmp_path)) == ['huis', 'boom', 'hond']
+
+
+def test_replaying_a_journal_left_by_an_interrupted_compaction(tmp_path):
+    history = open_history(tmp_path)
+    for word in ['huis', 'kat', 'hond']:
+        history.add(word)
+    history.remove('kat')
+    journal = (tmp_path / 'search_history.csv.journal').read_text()
+    history.compact()
+    # The snapshot was written but the journal was not truncated
+    (tmp_path / 'search_history.csv.journal').write_text(journal)
+
+    assert list(open_history(tmp_path)) == ['hond', 'huis']
+
+
+def test_load_keeps_the_newest_max_size_words(tmp_path):
+    history = open_history(tmp_path)
+    for word in ['huis', 'kat', 'hond', 'boom']:
+        history.add(word)
+
+    assert list(open_history(tmp_path, max_size=2)) == ['boom', 'hond']
+
+
+def test_journal_is_compacted_after_compact_after_entries(tmp_path):
+    history = open_history(tmp_path, compact_after=3)
+    history.add('huis')
+    history.add('kat')
+    history.add('hond')
+
+    assert (tmp_path / 'search_history.csv').read_text() == 'hond\nkat\nhuis\n'
+    assert (tmp_path / 'search_history.csv.journal').read_text() == ''
+    history.add('boom')
+    assert list(open_history(tmp_path)) == ['boom', 'hond', 'kat', 'huis']
+
+
+def test_write_behind_appends_the_journal_on_flush(tmp_path):
+    write_behind = WriteBehind(flush_interval=3600, max_dirty=1000)
+    try:
+        history = open_history(tmp_path, write_behind=write_behind)
+        history.add('huis')
+        history.add('kat')
+        assert not (tmp_path / 'search_history.csv.journal').exists()
+
+        write_behind.flush()
+        assert (tmp_path / 'search_history.csv.journal').read_text() == '+huis\n+kat\n'
+        assert list(open_history(tmp_path)) == ['kat', 'huis']
+    finally:
+        write_behind.close()
+
+
+def test_changes_after_the_write_behind_closed_are_written_inline(tmp_path):
+    write_behind = WriteBehind(flush_interval=3600, max_dirty=1000)
+    write_behind.close()
+    history = open_history(tmp_path, write_behind=write_behind)
+    history.add('huis')
+    history.add('kat')
+    history.remove('huis')
+
+    assert (tmp_path / 'search_history.csv.journal').read_text() == '+huis\n+kat\n-huis\n'
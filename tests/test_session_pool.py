@@ -0,0 +1,57 @@
+import pytest
+
+from session_pool import SessionPool
+
+
+class Session:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_least_recently_used_session_is_evicted():
+    pool = SessionPool(Session, max_sessions=2)
+    first = pool.get(1)
+    pool.get(2)
+    pool.get(1)
+    pool.get(3)
+
+    assert 2 not in pool
+    assert 1 in pool and 3 in pool
+    assert pool.get(1) is first and not first.closed
+
+
+def test_session_in_use_is_not_evicted():
+    pool = SessionPool(Session, max_sessions=1)
+    with pool.use(1) as session:
+        other = pool.get(2)
+        # The pool grows past its size rather than close a session mid-request
+        assert len(pool) == 2 and not session.closed
+        assert pool.get(1) is session
+    pool.get(3)
+
+    assert session.closed and other.closed
+    assert list(pool._sessions) == [3]
+
+
+def test_idle_session_in_use_is_not_evicted():
+    pool = SessionPool(Session, idle_timeout=0)
+    with pool.use(1) as session:
+        pool.get(2)
+        assert pool.get(1) is session and not session.closed
+    pool.get(3)
+
+    assert session.closed
+
+
+def test_session_is_released_when_the_request_fails():
+    pool = SessionPool(Session, max_sessions=1)
+    with pytest.raises(RuntimeError):
+        with pool.use(1) as session:
+            raise RuntimeError
+    pool.get(2)
+
+    assert session.closed
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def wait_for(condition):
+    while not condition():
+        time.sleep(0.001)
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        release.wait()
+        return 'huis'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('huis', lookup))) for _ in range(3)]
+    threads[0].start()
+    wait_for(lambda: calls)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: flight.followers == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['huis'] * 3
+    assert len(calls) == 1
+    assert (flight.leaders, flight.followers) == (1, 2)
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = RuntimeError('rate limited')
+
+    def lookup():
+        release.wait()
+        raise error
+
+    raised = []
+
+    def call():
+        try:
+            flight.do('huis', lookup)
+        except RuntimeError as e:
+            raised.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flight.leaders + flight.followers == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert raised == [error] * 3
+    # The failed call is not kept, so the next caller runs it again
+    assert flight.do('huis', lambda: 'huis') == 'huis'
+
+
+def test_async_followers_get_the_leaders_exception():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def lookup():
+            await release.wait()
+            raise RuntimeError('rate limited')
+
+        tasks = [asyncio.create_task(flight.ado('huis', lookup)) for _ in range(3)]
+        while flight.leaders + flight.followers < 3:
+            await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(result) for result in results] == ['rate limited'] * 3
+
+
+def test_cancelled_async_leader_hands_over_to_a_follower():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def stuck():
+            started.set()
+            await asyncio.Event().wait()
+
+        async def lookup():
+            return 'huis'
+
+        leader = asyncio.create_task(flight.ado('huis', stuck))
+        await started.wait()
+        follower = asyncio.create_task(flight.ado('huis', lookup))
+        while flight.followers < 1:
+            await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(follower, 1), flight
+
+    result, flight = asyncio.run(main())
+    assert result == 'huis'
+    assert flight.leaders == 2
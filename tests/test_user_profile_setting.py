@@ -0,0 +1,41 @@
+import pytest
+
+import user_profile_setting
+from user_profile_setting import ConnectionManager
+
+
+@pytest.fixture
+def profile_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_profile_setting, 'connections', ConnectionManager(str(tmp_path / 'profile_setting.db')))
+    monkeypatch.setattr(user_profile_setting, '_pending_words_learned', {})
+    user_profile_setting.init_db()
+
+
+def test_words_learned_are_added_on_flush(profile_db):
+    user_profile_setting.update_user_profile(1, daily_target=10, milestones=[])
+    user_profile_setting._pending_words_learned.update({1: 3, 2: 2})
+
+    assert user_profile_setting.get_user_profile(1)['total_words_learned'] == 3
+    user_profile_setting.flush_words_learned()
+    assert user_profile_setting._pending_words_learned == {}
+    assert user_profile_setting.get_user_profile(1) == {
+        'user_id': 1, 'daily_target': 10, 'total_words_learned': 3, 'milestones': []
+    }
+    # A user without a profile yet gets one
+    assert user_profile_setting.get_user_profile(2)['total_words_learned'] == 2
+
+
+def test_failed_flush_keeps_the_words_learned(profile_db, monkeypatch):
+    user_profile_setting._pending_words_learned.update({1: 3})
+
+    def writer():
+        raise OSError('disk full')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(user_profile_setting.connections, 'writer', writer)
+        with pytest.raises(OSError):
+            user_profile_setting.flush_words_learned()
+    assert user_profile_setting._pending_words_learned == {1: 3}
+
+    user_profile_setting.flush_words_learned()
+    assert user_profile_setting.get_user_profile(1)['total_words_learned'] == 3
@@ -1,40 +1,84 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import json
+import metrics
+from persistence import get_write_behind
 
+DB_PATH = 'profile_setting.db'
+
+class ConnectionManager:
+    """Reusable SQLite connections for the profile database.
+
+    Each thread keeps one writer and one query-only reader connection. The database runs
+    in WAL mode, so readers see the last committed state without blocking the writer,
+    and ``synchronous=NORMAL`` avoids an fsync on every commit.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _connect(self, query_only=False):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if query_only:
+            conn.execute('PRAGMA query_only=ON')
+        return conn
+
+    def reader(self):
+        conn = getattr(self._local, 'reader', None)
+        if conn is None:
+            conn = self._local.reader = self._connect(query_only=True)
+        return conn
+
+    @contextmanager
+    def writer(self):
+        conn = getattr(self._local, 'writer', None)
+        if conn is None:
+            conn = self._local.writer = self._connect()
+        with self._write_lock, conn:
+            yield conn
+
+connections = ConnectionManager()
+
+# Words learned per user that have not been written yet; flushed in one transaction
+_pending_words_learned = {}
+_pending_lock = threading.Lock()
+
+@metrics.timed(metrics.io_seconds, 'sqlite', 'init_db')
 def init_db():
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS user_profiles
-    (user_id INTEGER PRIMARY KEY, daily_target INTEGER, total_words_learned INTEGER,
-     milestones TEXT)
-    ''')
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS milestones
-    (id INTEGER PRIMARY KEY, words INTEGER, reward TEXT)
-    ''')
-    conn.commit()
-    conn.close()
+    with connections.writer() as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_profiles
+        (user_id INTEGER PRIMARY KEY, daily_target INTEGER, total_words_learned INTEGER,
+         milestones TEXT)
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS milestones
+        (id INTEGER PRIMARY KEY, words INTEGER, reward TEXT)
+        ''')
 
+@metrics.timed(metrics.io_seconds, 'sqlite', 'get_user_profile')
 def get_user_profile(user_id):
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM user_profiles WHERE user_id = ?', (user_id,))
+    cursor = connections.reader().execute('SELECT * FROM user_profiles WHERE user_id = ?', (user_id,))
     profile = cursor.fetchone()
-    conn.close()
     if profile:
+        with _pending_lock:
+            pending = _pending_words_learned.get(user_id, 0)
         return {
             'user_id': profile[0],
             'daily_target': profile[1],
-            'total_words_learned': profile[2],
+            'total_words_learned': (profile[2] or 0) + pending,
             'milestones': json.loads(profile[3]) if profile[3] else []
         }
     return None
 
+@metrics.timed(metrics.io_seconds, 'sqlite', 'update_user_profile')
 def update_user_profile(user_id, daily_target=None, milestones=None):
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
     updates = []
     params = []
     if daily_target is not None:
@@ -45,26 +89,43 @@ def update_user_profile(user_id, daily_target=None, milestones=None):
         params.append(json.dumps(milestones))
     
     if updates:
+        flush_words_learned()  # The INSERT OR REPLACE below copies total_words_learned
         query = f"INSERT OR REPLACE INTO user_profiles (user_id, daily_target, total_words_learned, milestones) VALUES (?, COALESCE(?, (SELECT daily_target FROM user_profiles WHERE user_id = ?)), COALESCE((SELECT total_words_learned FROM user_profiles WHERE user_id = ?), 0), ?)"
         params = [user_id, daily_target, user_id, user_id, json.dumps(milestones)]
-        cursor.execute(query, params)
-        conn.commit()
-    conn.close()
+        with connections.writer() as conn:
+            conn.execute(query, params)
 
 def increment_words_learned(user_id, count=1):
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
-    cursor.execute('UPDATE user_profiles SET total_words_learned = total_words_learned + ? WHERE user_id = ?', (count, user_id))
-    conn.commit()
-    conn.close()
+    with _pending_lock:
+        _pending_words_learned[user_id] = _pending_words_learned.get(user_id, 0) + count
+    get_write_behind().mark_dirty(DB_PATH, flush_words_learned)
 
+@metrics.timed(metrics.io_seconds, 'sqlite', 'flush_words_learned')
+def flush_words_learned():
+    global _pending_words_learned
+    with _pending_lock:
+        pending, _pending_words_learned = _pending_words_learned, {}
+    if not pending:
+        return
+    try:
+        with connections.writer() as conn:
+            conn.executemany(
+                'INSERT INTO user_profiles (user_id, total_words_learned) VALUES (?, ?) '
+                'ON CONFLICT (user_id) DO UPDATE SET '
+                'total_words_learned = COALESCE(total_words_learned, 0) + excluded.total_words_learned',
+                pending.items()
+            )
+    except Exception:
+        # Put the counts back, so the write-behind's retry still writes them
+        with _pending_lock:
+            for user_id, count in pending.items():
+                _pending_words_learned[user_id] = _pending_words_learned.get(user_id, 0) + count
+        raise
+
+@metrics.timed(metrics.io_seconds, 'sqlite', 'get_milestones')
 def get_milestones():
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM milestones ORDER BY words')
-    milestones = [{'id': row[0], 'words': row[1], 'reward': row[2]} for row in cursor.fetchall()]
-    conn.close()
-    return milestones
+    cursor = connections.reader().execute('SELECT * FROM milestones ORDER BY words')
+    return [{'id': row[0], 'words': row[1], 'reward': row[2]} for row in cursor.fetchall()]
 
 def check_milestones(user_id):
     profile = get_user_profile(user_id)
@@ -80,16 +141,12 @@ def check_milestones(user_id):
 
     return achieved_milestones if achieved_milestones else None
 
+@metrics.timed(metrics.io_seconds, 'sqlite', 'manage_milestones')
 def manage_milestones(action, milestone_id=None, words=None, reward=None):
-    conn = sqlite3.connect('profile_setting.db')
-    cursor = conn.cursor()
-    
-    if action == 'add':
-        cursor.execute('INSERT INTO milestones (words, reward) VALUES (?, ?)', (words, reward))
-    elif action == 'update':
-        cursor.execute('UPDATE milestones SET words = ?, reward = ? WHERE id = ?', (words, reward, milestone_id))
-    elif action == 'delete':
-        cursor.execute('DELETE FROM milestones WHERE id = ?', (milestone_id,))
-    
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with connections.writer() as conn:
+        if action == 'add':
+            conn.execute('INSERT INTO milestones (words, reward) VALUES (?, ?)', (words, reward))
+        elif action == 'update':
+            conn.execute('UPDATE milestones SET words = ?, reward = ? WHERE id = ?', (words, reward, milestone_id))
+        elif action == 'delete':
+            conn.execute('DELETE FROM milestones WHERE id = ?', (milestone_id,))
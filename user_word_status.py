@@ -0,0 +1,83 @@
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime
+
+
+class UserWordStatus:
+    """Sparse per-user word status on top of the shared ``WordDictionary``.
+
+    Only words the user has marked are stored, as word -> (status, last-updated epoch
+    seconds); every other word is unknown. ``known_ranks`` holds the dictionary ranks of
+    known words in ascending order, so ``top_unknown`` walks the dictionary from the most
+    frequent word and only has to skip the known words it passes. ``first_unknown`` is the
+    rank of the most frequent unknown word, so the walk skips the run of known words at the
+    top of the dictionary that long-time users build up.
+    """
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.statuses = {}
+        self.known_ranks = array('q')
+        self.first_unknown = 0
+
+    @classmethod
+    def from_rows(cls, dictionary, rows):
+        # rows: (word, status, last_updated) with last_updated a '%Y-%m-%d %H:%M:%S' string
+        word_status = cls(dictionary)
+        known_ranks = []
+        for word, status, last_updated in rows:
+            rank = dictionary.ranks.get(word)
+            if rank is None:
+                continue  # Dropped from the dictionary since it was marked
+            word_status.statuses[word] = (status, int(datetime.fromisoformat(last_updated).timestamp()))
+            if status != 0:
+                known_ranks.append(rank)
+        word_status.known_ranks.extend(sorted(known_ranks))
+        word_status._advance_first_unknown()
+        return word_status
+
+    def _advance_first_unknown(self):
+        # Ranks are unique and sorted, so the known prefix is where known_ranks[i] == i
+        known_ranks = self.known_ranks
+        while self.first_unknown < len(known_ranks) and known_ranks[self.first_unknown] == self.first_unknown:
+            self.first_unknown += 1
+
+    def __len__(self):
+        return len(self.statuses)
+
+    def status(self, word):
+        return self.statuses.get(word, (0, None))[0]
+
+    def last_updated(self, word):
+        epoch = self.statuses.get(word, (0, None))[1]
+        return None if epoch is None else datetime.fromtimestamp(epoch)
+
+    def set_status(self, word, status, last_updated):
+        rank = self.dictionary.ranks.get(word)
+        if rank is None:
+            return False
+        previous = self.status(word)
+        if previous == 0 and status != 0:
+            insort(self.known_ranks, rank)
+            self._advance_first_unknown()
+        elif previous != 0 and status == 0:
+            del self.known_ranks[bisect_left(self.known_ranks, rank)]
+            self.first_unknown = min(self.first_unknown, rank)
+        self.statuses[word] = (status, int(last_updated.timestamp()))
+        return True
+
+    def top_unknown(self, count, exclude=()):
+        words = []
+        known_ranks = self.known_ranks
+        dictionary_words = self.dictionary.words
+        next_known = self.first_unknown
+        for rank in range(self.first_unknown, len(dictionary_words)):
+            if len(words) >= count:
+                break
+            if next_known < len(known_ranks) and known_ranks[next_known] == rank:
+                next_known += 1
+                continue
+            word = dictionary_words[rank]
+            if word not in exclude:
+                words.append(word)
+        return words
@@ -0,0 +1,94 @@
+import sys
+from array import array
+from persistence import atomic_write
+
+SNAPSHOT_MAGIC = b'C2DDICT2'
+SNAPSHOT_TAG_SIZE = 16
+
+
+def write_snapshot(path, words, frequencies, tag=b''):
+    """Write words (in rank order) and their frequencies to a binary snapshot file.
+
+    Layout: magic, word count (int64), a 16-byte tag identifying the source data, the
+    frequencies as native int64, then the words as one UTF-8 blob separated by newlines,
+    so loading is two bulk reads.
+    """
+    frequency_array = array('q', frequencies)
+
+    def write(snapshot_file):
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(array('q', [len(frequency_array)]).tobytes())
+        snapshot_file.write(tag.ljust(SNAPSHOT_TAG_SIZE, b'\0')[:SNAPSHOT_TAG_SIZE])
+        snapshot_file.write(frequency_array.tobytes())
+        snapshot_file.write('\n'.join(words).encode('utf-8'))
+
+    atomic_write(path, write, binary=True)
+
+
+def snapshot_matches(path, tag):
+    # True if path holds a valid snapshot written with this tag
+    header_size = len(SNAPSHOT_MAGIC) + 8 + SNAPSHOT_TAG_SIZE
+    try:
+        with open(path, 'rb') as snapshot_file:
+            header = snapshot_file.read(header_size)
+    except OSError:
+        return False
+    return (len(header) == header_size and header.startswith(SNAPSHOT_MAGIC)
+            and header[len(SNAPSHOT_MAGIC) + 8:] == tag.ljust(SNAPSHOT_TAG_SIZE, b'\0')[:SNAPSHOT_TAG_SIZE])
+
+
+class WordDictionary:
+    """Compact, immutable dictionary shared by all users.
+
+    Words are kept in one list of interned strings in descending frequency order; a
+    word's position in that list (its rank) indexes the frequency array. Per-user word
+    status lives in ``UserWordStatus`` on top of this. Lookups return plain entry dicts
+    built on demand.
+    """
+
+    def __init__(self):
+        self.words = []
+        self.ranks = {}
+        self.frequencies = array('q')
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: (word, frequency) in descending frequency order
+        dictionary = cls()
+        for rank, (word, frequency) in enumerate(rows):
+            word = sys.intern(word)
+            dictionary.words.append(word)
+            dictionary.ranks[word] = rank
+            dictionary.frequencies.append(frequency)
+        return dictionary
+
+    @classmethod
+    def from_snapshot(cls, path):
+        with open(path, 'rb') as snapshot_file:
+            if snapshot_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"'{path}' is not a dictionary snapshot")
+            count = array('q', snapshot_file.read(8))[0]
+            snapshot_file.read(SNAPSHOT_TAG_SIZE)
+            dictionary = cls()
+            dictionary.frequencies.frombytes(snapshot_file.read(8 * count))
+            blob = snapshot_file.read().decode('utf-8')
+        dictionary.words = [sys.intern(word) for word in blob.split('\n')] if count else []
+        dictionary.ranks = {word: rank for rank, word in enumerate(dictionary.words)}
+        return dictionary
+
+    def __len__(self):
+        return len(self.words)
+
+    def __iter__(self):
+        for rank in range(len(self.words)):
+            yield self.entry(rank)
+
+    def __contains__(self, word):
+        return word in self.ranks
+
+    def entry(self, rank):
+        return {'word': self.words[rank], 'frequency': self.frequencies[rank]}
+
+    def get(self, word):
+        rank = self.ranks.get(word)
+        return None if rank is None else self.entry(rank)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class WordInfoCache:
+    """Persistent LRU cache for LLM answers, keyed by (word, model, prompt version).
+
+    A small in-memory OrderedDict sits in front of an SQLite table so repeated
+    lookups never touch the disk. The table is bounded to ``max_entries`` rows and
+    evicts the least recently used ones; ``ttl_seconds`` optionally expires entries.
+    """
+
+    def __init__(self, db_path='word_info_cache.db', max_entries=50000, ttl_seconds=None, memory_entries=2048):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS word_info_cache
+        (word TEXT NOT NULL, model TEXT NOT NULL, prompt_version TEXT NOT NULL,
+         value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL,
+         PRIMARY KEY (word, model, prompt_version))
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_word_info_cache_last_access ON word_info_cache (last_access)')
+        self._conn.commit()
+        self._size = self._conn.execute('SELECT COUNT(*) FROM word_info_cache').fetchone()[0]
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, word, model, prompt_version):
+        key = (word, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, created_at = cached
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    # Disk recency is refreshed lazily on the next write
+                    self._touched[key] = now
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                'SELECT value, created_at FROM word_info_cache WHERE word = ? AND model = ? AND prompt_version = ?',
+                key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._conn.execute(
+                    'DELETE FROM word_info_cache WHERE word = ? AND model = ? AND prompt_version = ?', key
+                )
+                self._conn.commit()
+                self._size -= 1
+                self._touched.pop(key, None)
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            self._remember(key, value, created_at)
+            self.hits += 1
+            return value
+
+    def set(self, word, model, prompt_version, value):
+        key = (word, model, prompt_version)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE word_info_cache SET value = ?, created_at = ?, last_access = ? '
+                'WHERE word = ? AND model = ? AND prompt_version = ?',
+                (value, now, now) + key
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    'INSERT INTO word_info_cache (word, model, prompt_version, value, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    key + (value, now, now)
+                )
+                self._size += 1
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+            self._remember(key, value, now)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                'UPDATE word_info_cache SET last_access = ? WHERE word = ? AND model = ? AND prompt_version = ?',
+                [(last_access,) + key for key, last_access in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                'DELETE FROM word_info_cache WHERE created_at < ?', (time.time() - self.ttl_seconds,)
+            )
+            self._size -= cursor.rowcount
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                'SELECT word, model, prompt_version FROM word_info_cache ORDER BY last_access LIMIT ?', (overflow,)
+            ).fetchall()
+            self._conn.executemany(
+                'DELETE FROM word_info_cache WHERE word = ? AND model = ? AND prompt_version = ?', evicted
+            )
+            self._size -= len(evicted)
+            for key in evicted:
+                self._memory.pop(tuple(key), None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': self._size,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM word_info_cache')
+            self._conn.commit()
+            self._memory.clear()
+            self._touched.clear()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+def cache_from_env():
+    ttl = os.getenv('WORD_INFO_CACHE_TTL')
+    return WordInfoCache(
+        db_path=os.getenv('WORD_INFO_CACHE_FILE', 'word_info_cache.db'),
+        max_entries=int(os.getenv('WORD_INFO_CACHE_SIZE', '50000')),
+        ttl_seconds=float(ttl) if ttl else None,
+    )
@@ -0,0 +1,93 @@
+import threading
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance between ``a`` and ``b``, or ``max_distance + 1`` if larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class DutchWordValidator:
+    """Local Dutch word validation and "did you mean" suggestions.
+
+    Membership is checked against the shared ``WordDictionary`` (built from the OpenTaal
+    word list), so validation is a hash lookup. Suggestions use a SymSpell-style index of
+    deletes over the ``vocabulary_size`` most frequent words, built on first use: a typo
+    and a candidate word match if they share a delete, and candidates are then ranked by
+    edit distance and frequency.
+    """
+
+    def __init__(self, dictionary, vocabulary_size=20000, max_distance=2, prefix_length=7):
+        self.dictionary = dictionary
+        self.vocabulary_size = vocabulary_size
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._deletes = None
+        self._lock = threading.Lock()
+
+    def normalize(self, word):
+        """Return the dictionary spelling of ``word`` (trying lowercase too), or None."""
+        if word in self.dictionary:
+            return word
+        lowered = word.lower()
+        if lowered in self.dictionary:
+            return lowered
+        return None
+
+    def is_valid(self, word):
+        return self.normalize(word) is not None
+
+    def _edits(self, word, distance, edits):
+        for i in range(len(word)):
+            delete = word[:i] + word[i + 1:]
+            if delete not in edits:
+                edits.add(delete)
+                if distance < self.max_distance:
+                    self._edits(delete, distance + 1, edits)
+        return edits
+
+    def _word_deletes(self, word):
+        prefix = word[:self.prefix_length]
+        return self._edits(prefix, 1, {prefix})
+
+    def _build(self):
+        deletes = {}
+        for rank, word in enumerate(self.dictionary.words[:self.vocabulary_size]):
+            for delete in self._word_deletes(word.lower()):
+                deletes.setdefault(delete, []).append(rank)
+        return deletes
+
+    def suggest(self, word, limit=3):
+        if self._deletes is None:
+            with self._lock:
+                if self._deletes is None:
+                    self._deletes = self._build()
+        word = word.lower()
+        candidates = set()
+        for delete in self._word_deletes(word):
+            candidates.update(self._deletes.get(delete, ()))
+        scored = []
+        for rank in candidates:
+            candidate = self.dictionary.words[rank]
+            distance = edit_distance(word, candidate.lower(), self.max_distance)
+            if 0 < distance <= self.max_distance:
+                # Lower rank means higher frequency
+                scored.append((distance, rank, candidate))
+        scored.sort()
+        return [candidate for _, _, candidate in scored[:limit]]